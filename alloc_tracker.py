@@ -0,0 +1,214 @@
+"""
+Rastreamento de alocações do loop do jogo (opt-in: python pacman.py --track-alloc).
+
+Usa as mesmas marcas de fase do profiler (lap(fase) na Simulation e no
+draw_frame). Em cada fase mede, com o tracemalloc:
+- transiente: o pico de memória acima do início da fase. Pega objetos que
+  nascem e morrem no mesmo frame, como listas de alvos e arrays temporários.
+- líquido: quanto a memória viva mudou.
+- blocos: quantos blocos do alocador do Python foram criados menos os liberados
+  (sys.getallocatedblocks).
+As pausas do coletor (gc.callbacks) vão para a fase em que aconteceram.
+
+Superfícies do pygame são alocadas pelo SDL, fora do tracemalloc: aparecem só
+pelo objeto Python que as embrulha. Na saída, summary() mostra o custo médio e
+o pior frame por fase, as pausas de GC e as linhas do jogo com mais memória
+ainda viva alocada durante a partida.
+"""
+import ast
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+from profiler import PHASES
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class _PhaseStats:
+    __slots__ = ('calls', 'transient', 'transient_max', 'net', 'blocks', 'gc_ms', 'gc_runs')
+
+    def __init__(self):
+        self.calls = self.transient = self.transient_max = 0
+        self.net = self.blocks = self.gc_runs = 0
+        self.gc_ms = 0.0
+
+
+_function_spans = {}
+
+
+def function_at(filename, lineno):
+    # nome qualificado da função mais interna que contém a linha
+    spans = _function_spans.get(filename)
+    if spans is None:
+        spans = []
+        try:
+            with open(filename, encoding='utf-8') as f:
+                tree = ast.parse(f.read())
+        except (OSError, SyntaxError, ValueError):
+            tree = None
+
+        def visit(node, prefix):
+            for child in ast.iter_child_nodes(node):
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    name = prefix + child.name
+                    if not isinstance(child, ast.ClassDef):
+                        spans.append((child.lineno, child.end_lineno, name))
+                    visit(child, name + '.')
+                else:
+                    visit(child, prefix)
+
+        if tree is not None:
+            visit(tree, '')
+        _function_spans[filename] = spans
+    best = '<módulo>'
+    best_start = 0
+    for start, end, name in spans:
+        if start <= lineno <= end and start >= best_start:
+            best, best_start = name, start
+    return best
+
+
+class AllocationTracker:
+    def __init__(self, frames=600, top=10):
+        # por frame: (transiente, líquido, blocos, ms de GC) somados nas fases
+        self.frames = deque(maxlen=frames)
+        self.top = top
+        self.phases = {}
+        self.gc_runs = [0, 0, 0]
+        self.gc_pause_max = 0.0
+        self.frame_count = 0
+        self._gc_start = 0.0
+        self._gc_pending = 0.0
+        self._gc_pending_runs = 0
+        self._in_frame = False
+        self._frame = [0, 0, 0, 0.0]
+        self._mark = 0
+        self._blocks = 0
+        # o que uma fase vazia mede (os ints da própria marca): descontado de cada fase
+        self._net_bias = 0
+        self._blocks_bias = 0
+        self._last = (0, 0, 0)
+        # outro lap (o do profiler) chamado entre a medida e a nova marca, para o que
+        # ele guarda não ser contado como alocação do jogo
+        self.chain = None
+        self._started_tracemalloc = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        gc.callbacks.append(self._on_gc)
+        self._reset_mark()
+        # fases vazias fora de frame: o que sobrar é o ruído da própria marca
+        samples = []
+        for _ in range(65):
+            self.lap(None)
+            samples.append(self._last)
+        samples.sort()
+        _, self._net_bias, self._blocks_bias = samples[len(samples) // 2]
+
+    def stop(self):
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self._gc_start = time.perf_counter()
+            return
+        pause = (time.perf_counter() - self._gc_start) * 1000
+        self._gc_pending += pause
+        self._gc_pending_runs += 1
+        self.gc_runs[info['generation']] += 1
+        if pause > self.gc_pause_max:
+            self.gc_pause_max = pause
+
+    def _reset_mark(self):
+        # a marca é tirada depois da contabilidade, para ela não contar na próxima fase
+        self._mark = tracemalloc.get_traced_memory()[0]
+        self._blocks = sys.getallocatedblocks()
+        tracemalloc.reset_peak()
+
+    def begin_frame(self):
+        self._in_frame = True
+        frame = self._frame
+        frame[0] = frame[1] = frame[2] = 0
+        frame[3] = 0.0
+        self._gc_pending = 0.0
+        self._gc_pending_runs = 0
+        self._reset_mark()
+
+    def lap(self, phase):
+        current, peak = tracemalloc.get_traced_memory()
+        blocks = sys.getallocatedblocks() - self._blocks - self._blocks_bias
+        transient = peak - self._mark
+        net = current - self._mark - self._net_bias
+        if self._in_frame:
+            stats = self.phases.get(phase)
+            if stats is None:
+                stats = self.phases[phase] = _PhaseStats()
+            stats.calls += 1
+            stats.transient += transient
+            if transient > stats.transient_max:
+                stats.transient_max = transient
+            stats.net += net
+            stats.blocks += blocks
+            stats.gc_ms += self._gc_pending
+            stats.gc_runs += self._gc_pending_runs
+            frame = self._frame
+            frame[0] += transient
+            frame[1] += net
+            frame[2] += blocks
+            frame[3] += self._gc_pending
+        self._last = transient, net, blocks
+        if self.chain is not None:
+            self.chain(phase)
+        self._gc_pending = 0.0
+        self._gc_pending_runs = 0
+        self._reset_mark()
+
+    def end_frame(self):
+        if not self._in_frame:
+            return
+        self._in_frame = False
+        self.frame_count += 1
+        self.frames.append(tuple(self._frame))
+
+    def live_sites(self):
+        """(arquivo, linha, função, blocos, bytes) das linhas do jogo com mais memória viva."""
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(True, os.path.join(_ROOT, '*')),
+             tracemalloc.Filter(False, __file__)])
+        sites = []
+        for stat in snapshot.statistics('lineno')[:self.top]:
+            frame = stat.traceback[0]
+            sites.append((os.path.relpath(frame.filename, _ROOT), frame.lineno,
+                          function_at(frame.filename, frame.lineno), stat.count, stat.size))
+        return sites
+
+    def summary(self):
+        n = max(self.frame_count, 1)
+        lines = [f'alocações em {self.frame_count} frames (média por frame / pior chamada)',
+                 f'{"fase":<18}{"transiente B":>14}{"pior B":>10}{"líquido B":>11}{"blocos":>9}{"GC ms":>9}']
+        order = {phase: i for i, phase in enumerate(PHASES)}
+        for phase in sorted(self.phases, key=lambda p: order.get(p, len(PHASES))):
+            s = self.phases[phase]
+            lines.append(f'{phase:<18}{s.transient / n:>14.0f}{s.transient_max:>10}{s.net / n:>11.0f}'
+                         f'{s.blocks / n:>9.1f}{s.gc_ms / n:>9.3f}')
+        if self.frames:
+            transient = sorted(f[0] for f in self.frames)
+            quiet = sum(1 for f in self.frames if f[0] == 0 and f[2] <= 0)
+            lines.append(f'frame: transiente p50 {transient[len(transient) // 2]} B, '
+                         f'pior {transient[-1]} B; {quiet}/{len(self.frames)} frames sem alocar')
+        lines.append(f'GC: {self.gc_runs[0]}/{self.gc_runs[1]}/{self.gc_runs[2]} coletas (geração 0/1/2), '
+                     f'pausa máxima {self.gc_pause_max:.2f} ms')
+        if tracemalloc.is_tracing():
+            lines.append('memória viva alocada durante a partida, por linha:')
+            for filename, lineno, func, count, size in self.live_sites():
+                lines.append(f'  {filename}:{lineno} {func}: {count} blocos, {size} B')
+        return '\n'.join(lines)
@@ -0,0 +1,397 @@
+"""
+Simulação em lote: N partidas avançando juntas com operações vetorizadas do NumPy.
+
+Cada partida segue exatamente as regras de simulation.Simulation.step(); o estado
+de todas fica em arrays com a partida no primeiro eixo. As árvores de decisão
+dos Ghost.move_* viram uma tabela gerada a partir dos próprios métodos, então
+qualquer mudança neles é refletida aqui automaticamente.
+"""
+import numpy as np
+from assets.board import boards
+from simulation import (Ghost, WIDTH, FPS, PLAYER_START, GHOST_STARTS, ELROY_PELLETS,
+                        INKY_RELEASE_PELLETS, CLYDE_RELEASE_PELLETS, CLYDE_SCATTER_RADIUS_TILES,
+                        mode_schedule, _tile_center, _tile_sizes, _PLAYER_HALF_HEIGHT)
+
+# funções de movimento, na ordem dos índices da MOVE_TABLE
+MOVE_BLINKY, MOVE_INKY, MOVE_PINKY, MOVE_CLYDE, MOVE_NONE = range(5)
+_MOVE_METHODS = [Ghost.move_blinky, Ghost.move_inky, Ghost.move_pinky, Ghost.move_clyde]
+
+_REVERSE = np.array([1, 0, 3, 2], dtype=np.int8)
+_MODE_SECS = np.array([secs for _, secs in mode_schedule], dtype=np.int64)
+_MODE_CHASE = np.array([name == 'chase' for name, _ in mode_schedule])
+_DX = np.array([1, -1, 0, 0], dtype=np.int32)
+_DY = np.array([0, 0, -1, 1], dtype=np.int32)
+_PLAYER_HALF = np.array(_PLAYER_HALF_HEIGHT, dtype=np.int32)
+
+
+def _build_move_table():
+    # O resultado de um move_* só depende da direção, dos turns, do sinal de
+    # target - posição e, no caso dos dois ifs seguidos, de ty < y + speed.
+    # Roda cada método uma vez por combinação e guarda direção e deslocamento
+    # em múltiplos de speed.
+    new_dir = np.zeros((4, 4, 16, 3, 4), dtype=np.int8)
+    step_x = np.zeros_like(new_dir)
+    step_y = np.zeros_like(new_dir)
+    ghost = Ghost.__new__(Ghost)
+    for f, method in enumerate(_MOVE_METHODS):
+        for d in range(4):
+            for bits in range(16):
+                for xcat in range(3):
+                    for ycat in range(4):
+                        ghost.x_pos, ghost.y_pos, ghost.speed, ghost.direction = 100, 100, 2, d
+                        ghost.turns = [bool(bits & (1 << k)) for k in range(4)]
+                        ghost.target = (99 + xcat, 99 + ycat)
+                        x, y, nd = method(ghost)
+                        new_dir[f, d, bits, xcat, ycat] = nd
+                        step_x[f, d, bits, xcat, ycat] = (x - 100) // 2
+                        step_y[f, d, bits, xcat, ycat] = (y - 100) // 2
+    return new_dir, step_x, step_y
+
+
+MOVE_TABLE = _build_move_table()
+
+
+class BatchSimulation:
+    """
+    N partidas em lockstep. step(actions) recebe um array (N,) com a nova
+    direction_command de cada partida (-1 mantém a atual); partidas em
+    game_over/game_won ficam congeladas até reset().
+    Fantasmas seguem a ordem blinky, inky, pinky, clyde no segundo eixo.
+    """
+
+    def __init__(self, n, board=None):
+        self.n = n
+        board = np.array(boards if board is None else board, dtype=np.uint8)
+        self.board = board
+        self.walls = board.copy()
+        self.walls[(board == 1) | (board == 2)] = 0
+        self.total_pellets = int(((board == 1) | (board == 2)).sum())
+        self.level = np.empty((n,) + board.shape, dtype=np.uint8)
+
+        self.frame = np.zeros(n, dtype=np.int64)
+        self.counter = np.zeros(n, dtype=np.int32)
+        self.flicker = np.zeros(n, dtype=bool)
+        self.moving = np.zeros(n, dtype=bool)
+        self.turns_allowed = np.zeros((n, 4), dtype=bool)
+        self.ghost_speeds = np.full((n, 4), 2, dtype=np.int32)
+        self.ghost_turns = np.zeros((n, 4, 4), dtype=bool)
+        self.ghost_in_box = np.zeros((n, 4), dtype=bool)
+
+        self.player_x = np.zeros(n, dtype=np.int32)
+        self.player_y = np.zeros(n, dtype=np.int32)
+        self.direction = np.zeros(n, dtype=np.int8)
+        self.direction_command = np.zeros(n, dtype=np.int8)
+        self.ghost_x = np.zeros((n, 4), dtype=np.int32)
+        self.ghost_y = np.zeros((n, 4), dtype=np.int32)
+        self.ghost_direction = np.zeros((n, 4), dtype=np.int8)
+        self.ghost_dead = np.zeros((n, 4), dtype=bool)
+        self.eaten_ghost = np.zeros((n, 4), dtype=bool)
+        self.startup_counter = np.zeros(n, dtype=np.int32)
+        self.powerup = np.zeros(n, dtype=bool)
+        self.power_counter = np.zeros(n, dtype=np.int32)
+
+        self.score = np.zeros(n, dtype=np.int64)
+        self.lives = np.zeros(n, dtype=np.int32)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.game_won = np.zeros(n, dtype=bool)
+        self.pellets_eaten = np.zeros(n, dtype=np.int32)
+        self.pellets_left = np.zeros(n, dtype=np.int32)
+        self.inky_released = np.zeros(n, dtype=bool)
+        self.clyde_released = np.zeros(n, dtype=bool)
+        self.blinky_elroy = np.zeros(n, dtype=bool)
+        self.mode_index = np.zeros(n, dtype=np.int32)
+        self.mode_timer_frames = np.zeros(n, dtype=np.int32)
+        self.targets = np.zeros((n, 4, 2), dtype=np.int32)
+
+        self.reset()
+        self.targets[:] = PLAYER_START
+
+        num1, num2 = _tile_sizes()
+        self._num1, self._num2 = num1, num2
+        self._corners = np.array([_tile_center(28, 1), _tile_center(28, 31),
+                                  _tile_center(1, 1), _tile_center(1, 31)], dtype=np.int32)
+        self._rows = np.arange(n)
+
+    @property
+    def done(self):
+        return self.game_over | self.game_won
+
+    @property
+    def current_mode_chase(self):
+        return _MODE_CHASE[self.mode_index]
+
+    def reset(self, mask=None):
+        # reinício completo das partidas selecionadas (todas se mask for None)
+        if mask is None:
+            mask = np.ones(self.n, dtype=bool)
+        self.reset_positions(mask)
+        self.level[mask] = self.board
+        self.score[mask] = 0
+        self.lives[mask] = 3
+        self.game_over[mask] = False
+        self.game_won[mask] = False
+        self.pellets_eaten[mask] = 0
+        self.pellets_left[mask] = self.total_pellets
+        self.inky_released[mask] = False
+        self.clyde_released[mask] = False
+        self.blinky_elroy[mask] = False
+        self.mode_index[mask] = 0
+        self.mode_timer_frames[mask] = 0
+
+    def reset_positions(self, mask):
+        self.startup_counter[mask] = 0
+        self.powerup[mask] = False
+        self.power_counter[mask] = 0
+        self.player_x[mask] = PLAYER_START[0]
+        self.player_y[mask] = PLAYER_START[1]
+        self.direction[mask] = 0
+        self.direction_command[mask] = 0
+        for i, (x, y, d) in enumerate(GHOST_STARTS):
+            self.ghost_x[mask, i] = x
+            self.ghost_y[mask, i] = y
+            self.ghost_direction[mask, i] = d
+        self.eaten_ghost[mask] = False
+        self.ghost_dead[mask] = False
+
+    def check_position(self, centerx, centery, direction):
+        # versão vetorizada de simulation.check_position (R, L, U, D)
+        num1, num2, num3 = self._num1, self._num2, 15
+        inner = centerx // 30 < 29
+        cx = np.where(inner, centerx, 0)
+        passable = self.walls < 3
+        row, col = centery // num1, cx // num2
+        up15 = passable[(centery - num3) // num1, col]
+        down15 = passable[(centery + num3) // num1, col]
+        left15 = passable[row, (cx - num3) // num2]
+        right15 = passable[row, (cx + num3) // num2]
+        mid_x = (12 <= cx % num2) & (cx % num2 <= 18)
+        mid_y = (12 <= centery % num1) & (centery % num1 <= 18)
+        vert = (direction == 2) | (direction == 3)
+        horz = ~vert
+
+        turns = np.zeros(direction.shape + (4,), dtype=bool)
+        turns[..., 0] = ((direction == 1) & right15) | (vert & mid_y & passable[row, (cx + num2) // num2]) \
+            | (horz & mid_y & right15)
+        turns[..., 1] = ((direction == 0) & left15) | (vert & mid_y & passable[row, (cx - num2) // num2]) \
+            | (horz & mid_y & left15)
+        turns[..., 2] = ((direction == 3) & up15) | (vert & mid_x & up15) \
+            | (horz & mid_x & passable[(centery - num1) // num1, col])
+        turns[..., 3] = ((direction == 2) & down15) | (vert & mid_x & down15) \
+            | (horz & mid_x & passable[(centery + num1) // num1, col])
+        turns[~inner] = (True, True, False, False)
+        return turns
+
+    def check_ghost_collisions(self, x_pos, y_pos, direction, dead):
+        # versão vetorizada de Ghost.check_collisions; o portão (9) só é
+        # atravessável pelos olhos (o flag box do loop original nunca é ligado)
+        num1, num2, num3 = self._num1, self._num2, 15
+        center_x, center_y = x_pos + 22, y_pos + 22
+        inner = (0 < center_x // 30) & (center_x // 30 < 29)
+        cx = np.where(inner, center_x, 30)
+        walls = self.walls
+
+        def passable(tile):
+            return (tile < 3) | ((tile == 9) & dead)
+
+        row, col = center_y // num1, cx // num2
+        up_tile = walls[(center_y - num3) // num1, col]
+        vert_mid = ((direction == 2) | (direction == 3)) & (12 <= center_y % num1) & (center_y % num1 <= 18)
+        turns = np.empty(x_pos.shape + (4,), dtype=bool)
+        turns[..., 0] = passable(walls[row, (cx + num3) // num2]) | (vert_mid & passable(walls[row, (cx + num2) // num2]))
+        turns[..., 1] = passable(walls[row, (cx - num3) // num2]) | (vert_mid & passable(walls[row, (cx - num2) // num2]))
+        turns[..., 2] = (up_tile == 9) | passable(up_tile)
+        turns[..., 3] = passable(walls[(center_y + num3) // num1, col])
+        turns[~inner] = (True, True, False, False)
+        in_box = (350 < x_pos) & (x_pos < 550) & (370 < y_pos) & (y_pos < 480)
+        return turns, in_box
+
+    def get_targets(self, active):
+        px, py = self.player_x, self.player_y
+        gx, gy = self.ghost_x, self.ghost_y
+        num1, num2 = self._num1, self._num2
+        n = self.n
+        runaway_x = np.where(px < 450, 900, 0)
+        runaway_y = np.where(py < 450, 900, 0)
+        d = self.direction
+        ahead_x = _DX[d] * num2
+        ahead_y = _DY[d] * num1
+
+        tx = np.empty((n, 4), dtype=np.int32)
+        ty = np.empty((n, 4), dtype=np.int32)
+        # chase/scatter
+        chase = self.current_mode_chase
+        tx[:, 0] = np.where(chase | self.blinky_elroy, px, self._corners[0, 0])
+        ty[:, 0] = np.where(chase | self.blinky_elroy, py, self._corners[0, 1])
+        two_x, two_y = px + 2 * ahead_x, py + 2 * ahead_y
+        tx[:, 1] = np.where(chase, gx[:, 0] + 2 * (two_x - gx[:, 0]), self._corners[1, 0])
+        ty[:, 1] = np.where(chase, gy[:, 0] + 2 * (two_y - gy[:, 0]), self._corners[1, 1])
+        tx[:, 2] = np.where(chase, px + 4 * ahead_x, self._corners[2, 0])
+        ty[:, 2] = np.where(chase, py + 4 * ahead_y, self._corners[2, 1])
+        dx_tiles = np.abs((px + 23) - (gx[:, 3] + 22)) / float(num2)
+        dy_tiles = np.abs((py + 24) - (gy[:, 3] + 22)) / float(num1)
+        near = np.sqrt(dx_tiles * dx_tiles + dy_tiles * dy_tiles) <= CLYDE_SCATTER_RADIUS_TILES
+        clyde_chase = chase & ~near
+        tx[:, 3] = np.where(clyde_chase, px, self._corners[3, 0])
+        ty[:, 3] = np.where(clyde_chase, py, self._corners[3, 1])
+
+        # powerup: fugindo, ou já comido (sai da box e volta a perseguir)
+        pu = self.powerup[:, None]
+        flee_x = np.stack([runaway_x, runaway_x, px, np.full(n, 450)], axis=1)
+        flee_y = np.stack([runaway_y, py, runaway_y, np.full(n, 450)], axis=1)
+        near_box = (340 < gx) & (gx < 560) & (340 < gy) & (gy < 500)
+        eaten = self.eaten_ghost
+        tx = np.where(pu & ~eaten, flee_x, tx)
+        ty = np.where(pu & ~eaten, flee_y, ty)
+        tx = np.where(pu & eaten, np.where(near_box, 400, px[:, None]), tx)
+        ty = np.where(pu & eaten, np.where(near_box, 100, py[:, None]), ty)
+
+        # olhos voltam para o covil
+        tx = np.where(self.ghost_dead, 380, tx)
+        ty = np.where(self.ghost_dead, 400, ty)
+
+        # alvo de saída quando na box (tile 9)
+        self.inky_released |= active & (self.pellets_eaten >= INKY_RELEASE_PELLETS)
+        self.clyde_released |= active & (self.pellets_eaten >= CLYDE_RELEASE_PELLETS)
+        leaving = self.ghost_in_box & ~self.ghost_dead
+        released = np.stack([np.ones(n, dtype=bool), self.inky_released,
+                             np.ones(n, dtype=bool), self.clyde_released], axis=1)
+        tx = np.where(leaving, np.where(released, 400, gx), tx)
+        ty = np.where(leaving, np.where(released, 100, gy), ty)
+        return tx, ty
+
+    def step(self, actions=None):
+        active = ~(self.game_over | self.game_won)
+        self.frame += active
+
+        wrap = active & (self.counter >= 19)
+        self.counter = np.where(active, np.where(wrap, 0, self.counter + 1), self.counter)
+        self.flicker = np.where(wrap, True, np.where(active & (self.counter > 3), False, self.flicker))
+
+        expire = active & self.powerup & (self.power_counter >= 600)
+        self.power_counter += active & self.powerup & (self.power_counter < 600)
+        self.power_counter[expire] = 0
+        self.powerup[expire] = False
+        self.eaten_ghost[expire] = False
+
+        starting = self.startup_counter < 60
+        self.moving = np.where(active, ~starting, self.moving)
+        self.startup_counter += active & starting
+
+        # scheduler de modos
+        ticking = active & ~self.powerup
+        self.mode_timer_frames += ticking
+        switch = ticking & (self.mode_timer_frames >= _MODE_SECS[self.mode_index] * FPS)
+        self.mode_timer_frames[switch] = 0
+        self.mode_index[switch] = (self.mode_index[switch] + 1) % len(mode_schedule)
+        self.ghost_direction[switch] = _REVERSE[self.ghost_direction[switch]]
+
+        # Elroy
+        self.blinky_elroy |= active & (self.pellets_eaten >= ELROY_PELLETS)
+        center_x = self.player_x + 23
+        center_y = self.player_y + 24
+
+        speeds = np.where(self.powerup, 1, 2)[:, None].repeat(4, axis=1)
+        speeds[:, 0] = np.where(self.blinky_elroy & ~self.powerup & ~self.ghost_dead[:, 0], 3, speeds[:, 0])
+        speeds[self.eaten_ghost] = 2
+        speeds[self.ghost_dead] = 4
+        self.ghost_speeds = np.where(active[:, None], speeds, self.ghost_speeds)
+
+        self.game_won |= active & (self.pellets_left == 0)
+
+        # retângulo do player_circle, recortado na borda da tela como o pygame faz
+        left = np.maximum(center_x - 20, 0)
+        right = np.minimum(center_x + 20, WIDTH)
+        gcx, gcy = self.ghost_x + 22, self.ghost_y + 22
+        half = _PLAYER_HALF[np.clip(right - left, 0, len(_PLAYER_HALF) - 1)]
+        hit = (right > left)[:, None] & (left[:, None] < gcx + 18) & (gcx - 18 < right[:, None]) \
+            & ((center_y - half)[:, None] < gcy + 18) & (gcy - 18 < (center_y + half)[:, None])
+
+        ghost_turns, in_box = self.check_ghost_collisions(self.ghost_x, self.ghost_y, self.ghost_direction,
+                                                          self.ghost_dead)
+        self.ghost_turns = np.where(active[:, None, None], ghost_turns, self.ghost_turns)
+        self.ghost_in_box = np.where(active[:, None], in_box, self.ghost_in_box)
+        start_dead = self.ghost_dead.copy()
+        old_tx, old_ty = self.targets[..., 0], self.targets[..., 1]
+        tx, ty = self.get_targets(active)
+        new_targets = np.stack([tx, ty], axis=-1)
+
+        self.turns_allowed = np.where(active[:, None], self.check_position(center_x, center_y, self.direction),
+                                      self.turns_allowed)
+        moving = active & self.moving
+
+        # pacman
+        d = self.direction
+        go = moving & self.turns_allowed[self._rows, d]
+        self.player_x += np.where(go, _DX[d] * 2, 0)
+        self.player_y += np.where(go, _DY[d] * 2, 0)
+
+        # fantasmas
+        dead = start_dead
+        fn = np.empty((self.n, 4), dtype=np.int8)
+        fn[:, 0] = np.where(dead[:, 0] | in_box[:, 0], MOVE_CLYDE, MOVE_BLINKY)
+        fn[:, 2] = np.where(dead[:, 2] | in_box[:, 2], MOVE_CLYDE, MOVE_PINKY)
+        fn[:, 1] = np.where(dead[:, 1], MOVE_CLYDE, np.where(self.inky_released, MOVE_INKY, MOVE_NONE))
+        fn[:, 3] = np.where(dead[:, 3] | self.clyde_released, MOVE_CLYDE, MOVE_NONE)
+        fn[~moving] = MOVE_NONE
+        movers = fn != MOVE_NONE
+        bits = (ghost_turns * np.array([1, 2, 4, 8])).sum(axis=-1)
+        xcat = np.sign(old_tx - self.ghost_x) + 1
+        dy = old_ty - self.ghost_y
+        ycat = np.where(dy < 0, 0, np.where(dy == 0, 1, np.where(dy < speeds, 2, 3)))
+        key = (np.where(movers, fn, 0), self.ghost_direction, bits, xcat, ycat)
+        new_dir, step_x, step_y = MOVE_TABLE[0][key], MOVE_TABLE[1][key], MOVE_TABLE[2][key]
+        gx = self.ghost_x + np.where(movers, step_x * speeds, 0)
+        gy = self.ghost_y + np.where(movers, step_y * speeds, 0)
+        gx = np.where(movers & (gx < -30), 900, np.where(movers & (gx > 900), -30, gx))
+        self.ghost_x[:], self.ghost_y[:] = gx, gy
+        self.ghost_direction[movers] = new_dir[movers]
+        self.targets[active] = new_targets[active]
+
+        # pellets (check_collisions)
+        num1, num2 = self._num1, self._num2
+        eat = active & (0 < self.player_x) & (self.player_x < 870)
+        row = np.where(eat, center_y // num1, 0)
+        col = np.where(eat, center_x // num2, 0)
+        tile = self.level[self._rows, row, col]
+        dot = eat & (tile == 1)
+        big = eat & (tile == 2)
+        self.level[self._rows[dot | big], row[dot | big], col[dot | big]] = 0
+        self.score += np.where(dot, 10, np.where(big, 50, 0))
+        self.pellets_eaten += dot | big
+        self.pellets_left -= dot | big
+        self.powerup |= big
+        self.power_counter[big] = 0
+        self.eaten_ghost[big] = False
+
+        # colisão com fantasmas
+        hit &= active[:, None]
+        caught = ~self.powerup & (hit & ~start_dead).any(axis=1)
+        lose_life = caught & (self.lives > 0)
+        self.lives -= lose_life
+        self.reset_positions(lose_life)
+        over = caught & ~lose_life
+        self.game_over |= over
+        self.moving[over] = False
+        self.startup_counter[over] = 0
+        self.mode_index[over] = 0
+        self.mode_timer_frames[over] = 0
+        self.blinky_elroy[over] = False
+        self.inky_released[over] = False
+        self.clyde_released[over] = False
+        for i in range(4):
+            eats = self.powerup & hit[:, i] & ~start_dead[:, i] & ~self.eaten_ghost[:, i]
+            self.ghost_dead[eats, i] = True
+            self.eaten_ghost[eats, i] = True
+            self.score += np.where(eats, (2 ** self.eaten_ghost.sum(axis=1)) * 100, 0)
+
+        if actions is not None:
+            actions = np.asarray(actions)
+            self.direction_command[:] = np.where(active & (actions >= 0), actions, self.direction_command)
+        cmd = self.direction_command
+        turn = active & self.turns_allowed[self._rows, cmd]
+        self.direction[turn] = cmd[turn]
+
+        px = self.player_x
+        self.player_x[:] = np.where(active & (px > 900), -47, np.where(active & (px < -50), 897, px))
+
+        self.ghost_dead &= ~(active[:, None] & in_box)
@@ -0,0 +1,59 @@
+"""
+Compara Simulation.advance com step() frame a frame num soak headless: a mesma
+partida, com cada ação valendo hold frames, roda dos dois jeitos. Confere que o
+estado final é o mesmo e mede frames/s. advance só pula a largada congelada
+depois de cada reinício ou vida perdida (uns 10% dos frames de uma partida
+aleatória), então o ganho fica nessa ordem.
+
+    python -m benchmarks.bench_macro_step --hold 60 240 100000
+"""
+import time
+import random
+import argparse
+from simulation import Simulation
+
+
+def soak(frames, hold, seed, macro):
+    sim = Simulation()
+    rng = random.Random(seed)
+    done = 0
+    t = time.perf_counter()
+    while done < frames:
+        if sim.done:
+            sim.reset()
+        action = rng.randrange(4)
+        if macro:
+            done += sim.advance(hold, action)
+            continue
+        for k in range(hold):
+            if sim.done:
+                break
+            sim.step(action if k == 0 else None)
+            done += 1
+    return done / (time.perf_counter() - t), sim.snapshot()
+
+
+def main(frames, holds, repeat, seed):
+    # a MoveTable é montada uma vez por tabuleiro: fora da medida
+    Simulation()
+    for hold in holds:
+        step_fps = advance_fps = 0.0
+        for _ in range(repeat):
+            fps, expected = soak(frames, hold, seed, False)
+            step_fps = max(step_fps, fps)
+            fps, got = soak(frames, hold, seed, True)
+            advance_fps = max(advance_fps, fps)
+            if got != expected:
+                raise SystemExit(f'hold {hold}: advance divergiu de step()')
+        print(f'hold {hold:>6}: step {step_fps:9.0f} fps   advance {advance_fps:9.0f} fps   '
+              f'x{advance_fps / step_fps:.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='advance() x step() num soak headless.')
+    parser.add_argument('--frames', type=int, default=60000)
+    parser.add_argument('--hold', type=int, nargs='+', default=[4, 60, 240, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    main(args.frames, args.hold, args.repeat, args.seed)
@@ -0,0 +1,112 @@
+"""
+Compara as probes de parede originais (check_position / probe_ghost_turns) com
+as consultas na MoveTable, usando posições gravadas de uma partida real.
+
+Antes de medir, confere a tabela contra as probes em todas as chaves: cada
+centro (x, y) da faixa tabelada, cada direção e cada modo (pacman, fantasma
+sem e com o portão). Qualquer diferença aborta o benchmark.
+
+    python -m benchmarks.bench_move_tables
+"""
+import sys
+import time
+import random
+from simulation import (Simulation, MoveTable, check_position, probe_ghost_turns, move_table_for,
+                        _X_MIN, _X_MAX)
+from runner import random_policy
+
+
+def record_positions(frames=20000, seed=0):
+    sim = Simulation()
+    rng = random.Random(seed)
+    player, ghosts = [], []
+    for _ in range(frames):
+        if sim.done:
+            sim.reset()
+        sim.step(random_policy(sim, rng))
+        player.append((sim.player_x + 23, sim.player_y + 24, sim.direction))
+        for g in sim.ghosts:
+            ghosts.append((g.center_x, g.center_y, g.direction, g.dead))
+    return player, ghosts
+
+
+def _probe(func, *args):
+    # a probe estoura IndexError fora do tabuleiro; a consulta na tabela tem que estourar igual
+    try:
+        return tuple(func(*args))
+    except IndexError:
+        return IndexError
+
+
+def verify(board):
+    """Confere a MoveTable contra as probes em todas as chaves; devolve quantas conferiu."""
+    sim = Simulation(board)
+    level, table = sim.level, move_table_for(sim.board)
+    checked = 0
+    mismatches = []
+    for cy in range(len(table.ykey)):
+        for cx in range(_X_MIN, _X_MAX):
+            for d in range(4):
+                ref = _probe(check_position, level, cx, cy, d)
+                got = _probe(table.player_turns, cx, cy, d)
+                if got != ref:
+                    mismatches.append(('pacman', cx, cy, d, ref, got))
+                for gate in (False, True):
+                    ref = _probe(probe_ghost_turns, level, cx, cy, d, gate)
+                    got = _probe(table.ghost_turns, cx, cy, d, gate)
+                    if got != ref:
+                        mismatches.append(('fantasma', cx, cy, d, gate, ref, got))
+                checked += 3
+    if mismatches:
+        for case in mismatches[:10]:
+            print('DIFERENTE:', *case, file=sys.stderr)
+        raise SystemExit(f'MoveTable diverge das probes em {len(mismatches)} de {checked} casos')
+    return checked
+
+
+def best_of(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        t = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main():
+    t = time.perf_counter()
+    checked = verify(Simulation().board)
+    print(f'tabela igual às probes em {checked} casos ({time.perf_counter() - t:.1f}s)')
+    player, ghosts = record_positions()
+    sim = Simulation()
+    level, table = sim.level, move_table_for(sim.board)
+
+    def ref_player():
+        for cx, cy, d in player:
+            check_position(level, cx, cy, d)
+
+    def table_player():
+        for cx, cy, d in player:
+            table.player_turns(cx, cy, d)
+
+    def ref_ghosts():
+        for cx, cy, d, gate in ghosts:
+            probe_ghost_turns(level, cx, cy, d, gate)
+
+    def table_ghosts():
+        for cx, cy, d, gate in ghosts:
+            table.ghost_turns(cx, cy, d, gate)
+
+    for name, ref, fast, n in [('check_position', ref_player, table_player, len(player)),
+                               ('ghost check_collisions', ref_ghosts, table_ghosts, len(ghosts))]:
+        t_ref, t_fast = best_of(ref), best_of(fast)
+        print(f'{name:>24}: probes {t_ref / n * 1e9:7.0f} ns/call   tabela {t_fast / n * 1e9:7.0f} ns/call'
+              f'   ({t_ref / t_fast:.1f}x)')
+
+    t = time.perf_counter()
+    MoveTable(sim.board)
+    print(f'{"construção da tabela":>24}: {time.perf_counter() - t:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
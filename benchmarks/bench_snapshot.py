@@ -0,0 +1,45 @@
+"""
+Mede Simulation.snapshot()/restore() numa partida real: tamanho do blob, tempo
+de cada chamada e um rewind de estados vizinhos, como numa busca.
+
+    python -m benchmarks.bench_snapshot
+"""
+import time
+import random
+from simulation import Simulation
+from runner import random_policy
+
+
+def main(frames=5000, seed=0):
+    sim = Simulation()
+    rng = random.Random(seed)
+    states = []
+    for _ in range(frames):
+        if sim.done:
+            sim.reset()
+        states.append(sim.snapshot())
+        sim.step(random_policy(sim, rng))
+
+    t = time.perf_counter()
+    for _ in range(frames):
+        sim.snapshot()
+    t_snap = (time.perf_counter() - t) / frames
+
+    blob = states[len(states) // 2]
+    t = time.perf_counter()
+    for _ in range(frames):
+        sim.restore(blob)
+    t_restore = (time.perf_counter() - t) / frames
+
+    t = time.perf_counter()
+    for state in reversed(states):
+        sim.restore(state)
+    t_rewind = (time.perf_counter() - t) / frames
+
+    print(f'blob: {len(blob)} bytes')
+    print(f'snapshot: {t_snap * 1e6:.2f} us   restore: {t_restore * 1e6:.2f} us   '
+          f'rewind frame a frame: {t_rewind * 1e6:.2f} us/estado')
+
+
+if __name__ == '__main__':
+    main()
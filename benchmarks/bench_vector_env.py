@@ -0,0 +1,43 @@
+"""
+Steps/s do SharedVectorEnv conforme o número de workers, com ações aleatórias.
+
+    python -m benchmarks.bench_vector_env --envs 64 --steps 2000
+"""
+import os
+import time
+import argparse
+import numpy as np
+from env import N_ACTIONS
+from vector_env import SharedVectorEnv
+
+
+def measure(num_envs, workers, steps, seed=0):
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(0, N_ACTIONS, size=(steps, num_envs), dtype=np.int8)
+    with SharedVectorEnv(num_envs, workers) as venv:
+        venv.reset()
+        t = time.perf_counter()
+        for k in range(steps):
+            venv.step(actions[k])
+        elapsed = time.perf_counter() - t
+    return num_envs * steps / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Steps/s do SharedVectorEnv por número de workers.')
+    parser.add_argument('--envs', type=int, default=64)
+    parser.add_argument('--steps', type=int, default=1000)
+    parser.add_argument('--workers', type=int, nargs='*', default=None)
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    counts = args.workers or sorted({1, 2, 4, 8, 16, 32, cpus} & set(range(1, cpus + 1)) | {1})
+    base = None
+    for workers in counts:
+        rate = measure(args.envs, workers, args.steps)
+        base = base or rate
+        print(f'{workers:>3} workers: {rate:9.0f} steps/s  ({rate / base:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
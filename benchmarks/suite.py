@@ -0,0 +1,276 @@
+"""
+Suíte de benchmarks dos caminhos quentes da simulação e do renderer.
+
+Micro (ns por chamada): check_position, Ghost.check_collisions, cada move_*,
+get_targets, check_collisions, a_star_path e a distância no grafo de junções
+entre todos os pares de tiles, draw_board e cada overlay. Macro (frames/s): simulação headless e frame
+renderizado com o driver de vídeo dummy.
+
+Tudo roda sobre a mesma partida (política aleatória com seed fixa), então duas
+execuções medem o mesmo trabalho. Cada medida é repetida e fica a melhor. Os
+resultados vão para JSON e o modo --compare aponta o que piorou além do limite:
+
+    python -m benchmarks.suite --out antes.json
+    python -m benchmarks.suite --out depois.json
+    python -m benchmarks.suite --compare antes.json depois.json --threshold 0.10
+"""
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+from simulation import Simulation, Ghost, WIDTH, HEIGHT, _tile_center, _tile_sizes
+from runner import random_policy
+from maze_graph import maze_graph_for
+
+# renderer sem janela: precisa ser definido antes do pygame abrir o vídeo
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+import pacman
+
+GHOST_NAMES = ('blinky', 'inky', 'pinky', 'clyde')
+MOVES = ('move_blinky', 'move_inky', 'move_pinky', 'move_clyde')
+
+
+def record_states(frames, seed):
+    # snapshot antes de cada step de uma partida, para os micro que mexem no estado
+    sim = Simulation()
+    rng = random.Random(seed)
+    states = []
+    for _ in range(frames):
+        if sim.done:
+            sim.reset()
+        states.append(sim.snapshot())
+        sim.step(random_policy(sim, rng))
+    return states
+
+
+def timer_overhead():
+    # custo do par de perf_counter em volta de cada chamada, descontado das medidas
+    best = float('inf')
+    for _ in range(5):
+        total = 0.0
+        for _ in range(2000):
+            t = time.perf_counter()
+            total += time.perf_counter() - t
+        best = min(best, total / 2000)
+    return best
+
+
+def measure(cases, prepare, call, repeat, overhead):
+    """
+    Melhor tempo médio por chamada. prepare(caso) monta o estado fora da medida e
+    devolve os argumentos; só call(*args) é cronometrado.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        total = 0.0
+        for case in cases:
+            args = prepare(case)
+            t = time.perf_counter()
+            call(*args)
+            total += time.perf_counter() - t
+        best = min(best, total / len(cases) - overhead)
+    return max(best, 0.0)
+
+
+def sync_ghost(sim, i):
+    # o que step() faz com o fantasma i antes de movê-lo
+    name = GHOST_NAMES[i]
+    ghost = sim.ghosts[i]
+    ghost.update(getattr(sim, name + '_x'), getattr(sim, name + '_y'), sim.targets[i], sim.ghost_speeds[i],
+                 getattr(sim, name + '_direction'), getattr(sim, name + '_dead'), getattr(sim, name + '_box'))
+    return ghost
+
+
+class LiveGame:
+    """
+    Partida que avança um frame por caso, para os benchmarks de desenho: restaurar
+    snapshots apagaria o cache das camadas do tabuleiro a cada chamada.
+    """
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.sim = Simulation()
+        self.rng = None
+
+    def advance(self, k):
+        sim = self.sim
+        if k == 0:
+            sim.reset()
+            self.rng = random.Random(self.seed)
+        if sim.done:
+            sim.reset()
+        sim.step(random_policy(sim, self.rng))
+        pacman.sim = sim
+        return sim
+
+
+def init_renderer():
+    pygame.display.init()
+    pygame.font.init()
+    pacman.screen = pygame.display.set_mode([WIDTH, HEIGHT])
+    pacman.load_assets()
+
+
+def micro_benchmarks(states, repeat, overhead, a_star_stride, seed):
+    sim = Simulation()
+
+    def player_center(blob):
+        sim.restore(blob)
+        return sim.player_x + 23, sim.player_y + 24
+
+    def positions(blob):
+        sim.restore(blob)
+        return (sim.blinky_x, sim.blinky_y, sim.inky_x, sim.inky_y,
+                sim.pinky_x, sim.pinky_y, sim.clyde_x, sim.clyde_y)
+
+    def ghost_case(case):
+        blob, i = case
+        sim.restore(blob)
+        return sync_ghost(sim, i),
+
+    ghost_cases = [(blob, i) for blob in states for i in range(4)]
+    yield 'check_position', measure(states, player_center, sim.check_position, repeat, overhead)
+    yield 'Ghost.check_collisions', measure(ghost_cases, ghost_case, Ghost.check_collisions, repeat, overhead)
+    for i, move in enumerate(MOVES):
+        cases = [(blob, i) for blob in states]
+        yield f'Ghost.{move}', measure(cases, ghost_case, getattr(Ghost, move), repeat, overhead)
+    yield 'get_targets', measure(states, positions, sim.get_targets, repeat, overhead)
+    yield 'check_collisions', measure(states, player_center, sim.check_collisions, repeat, overhead)
+
+    level = sim.level
+    points = [_tile_center(c, r) for r in range(level.rows) for c in range(level.cols)
+              if level.walkable[level.index(r, c)]]
+    pairs = [(a, b, level) for a in points[::a_star_stride] for b in points]
+    # todos os pares já são milhares de buscas: uma passada só
+    yield 'a_star_path', measure(pairs, lambda case: case, pacman.a_star_path, 1, overhead)
+    # a mesma consulta no grafo de junções: distância entre os tiles, com o portão
+    graph = maze_graph_for()
+    num1, num2 = _tile_sizes()
+    tiles = [(x // num2, y // num1) for x, y in points if graph.locate((x // num2, y // num1))]
+    tile_pairs = [(a, b, True) for a in tiles[::a_star_stride] for b in tiles]
+    yield 'maze_graph_distance', measure(tile_pairs, lambda case: case, graph.tile_distance, 1, overhead)
+
+    init_renderer()
+    game = LiveGame(seed)
+    frames = range(len(states))
+
+    def no_args(k):
+        game.advance(k)
+        return ()
+
+    def overlay_args(k):
+        s = game.advance(k)
+        return s.ghosts, s.targets, (s.player_x + 23, s.player_y + 24), s.direction
+
+    def hacker_args(k):
+        return overlay_args(k) + (game.sim.level,)
+
+    def matrix_args(k):
+        return game.advance(k).level, pacman.screen, WIDTH, HEIGHT, _tile_sizes
+
+    yield 'draw_board', measure(frames, no_args, pacman.draw_board, repeat, overhead)
+    yield 'draw_vector_overlay', measure(frames, overlay_args, pacman.draw_vector_overlay, repeat, overhead)
+    yield 'draw_hacker_overlay', measure(frames, hacker_args, pacman.draw_hacker_overlay, repeat, overhead)
+    yield 'draw_matrix_overlay', measure(frames, matrix_args, pacman.draw_matrix_overlay, repeat, overhead)
+
+
+def frames_per_second(frames, repeat, seed, render):
+    best = 0.0
+    game = LiveGame(seed)
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for k in range(frames):
+            game.advance(k)
+            if render:
+                pacman.draw_frame()
+                pygame.display.flip()
+        best = max(best, frames / (time.perf_counter() - t))
+    return best
+
+
+def run(args):
+    overhead = timer_overhead()
+    states = record_states(args.frames, args.seed)
+    results = {}
+
+    def report(name, value, unit, better):
+        results[name] = {'value': value, 'unit': unit, 'better': better}
+        print(f'{name:>24}: {value:12.1f} {unit}', flush=True)
+
+    for name, seconds in micro_benchmarks(states, args.repeat, overhead, args.a_star_stride, args.seed):
+        report(name, seconds * 1e9, 'ns', 'lower')
+    report('headless_fps', frames_per_second(args.macro_frames, args.repeat, args.seed, False), 'fps', 'higher')
+    report('rendered_fps', frames_per_second(args.macro_frames // 10, args.repeat, args.seed, True), 'fps', 'higher')
+
+    meta = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+            'pygame': pygame.version.ver, 'machine': platform.machine(), 'platform': platform.platform(),
+            'frames': args.frames, 'macro_frames': args.macro_frames, 'repeat': args.repeat,
+            'a_star_stride': args.a_star_stride, 'seed': args.seed}
+    if args.out:
+        tmp = args.out + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'meta': meta, 'results': results}, f, indent=2)
+        os.replace(tmp, args.out)
+        print(f'resultados em {args.out}')
+
+
+def compare(base_path, new_path, threshold):
+    """Imprime a diferença de cada benchmark; devolve quantos pioraram além de threshold."""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    for key in ('frames', 'macro_frames', 'a_star_stride', 'seed'):
+        if base['meta'].get(key) != new['meta'].get(key):
+            print(f'aviso: {key} diferente ({base["meta"].get(key)} x {new["meta"].get(key)}), '
+                  f'as medidas não são do mesmo trabalho')
+    print('variação: + é mais lento')
+    regressions = 0
+    for name, old in base['results'].items():
+        cur = new['results'].get(name)
+        if cur is None:
+            print(f'{name:>24}: ausente em {new_path}')
+            continue
+        a, b = old['value'], cur['value']
+        # slowdown > 0 é piora (mais tempo ou menos fps)
+        if old['better'] == 'lower':
+            slowdown = b / a - 1 if a else 0.0
+        else:
+            slowdown = a / b - 1 if b else float('inf')
+        flag = ''
+        if slowdown > threshold:
+            flag = '  REGRESSÃO'
+            regressions += 1
+        elif slowdown < -threshold:
+            flag = '  melhorou'
+        print(f'{name:>24}: {a:12.1f} -> {b:12.1f} {old["unit"]:>3}  {slowdown:+7.1%}{flag}')
+    for name in new['results'].keys() - base['results'].keys():
+        print(f'{name:>24}: novo, sem base')
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks da simulação e do renderer.')
+    parser.add_argument('--out', help='arquivo JSON para gravar os resultados')
+    parser.add_argument('--frames', type=int, default=2000, help='estados/frames por micro benchmark')
+    parser.add_argument('--macro-frames', type=int, default=20000, help='frames do macro headless (renderizado usa 1/10)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--a-star-stride', type=int, default=1,
+                        help='usa 1 de cada N tiles de origem no a_star_path (1 = todos os pares)')
+    parser.add_argument('--quick', action='store_true', help='atalho para rodadas rápidas durante o desenvolvimento')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NOVO'))
+    parser.add_argument('--threshold', type=float, default=0.10, help='piora relativa tolerada (0.10 = 10%%)')
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare(*args.compare, args.threshold)
+        print(f'{regressions} regressões acima de {args.threshold:.0%}')
+        sys.exit(1 if regressions else 0)
+    if args.quick:
+        args.frames, args.macro_frames, args.repeat, args.a_star_stride = 500, 5000, 3, 16
+    run(args)
@@ -0,0 +1,145 @@
+"""
+Ambiente no estilo Gymnasium em cima da Simulation, para treino de RL.
+
+A observação é uma pilha de planos uint8 (canal, linha, coluna) alocada uma vez
+só; cada step() só apaga e marca os tiles que mudaram, então o array devolvido
+é sempre o mesmo objeto. Quem quiser guardar observações (replay buffer) copia.
+A recompensa é o quanto o score subiu no frame: pellets e power pellets em
+check_collisions e fantasmas comidos.
+
+    env = PacmanEnv()
+    obs, info = env.reset(seed=0)
+    obs, reward, terminated, truncated, info = env.step(2)
+"""
+import numpy as np
+from simulation import Simulation, MAX_FRAMES, _tile_sizes
+
+try:
+    from gymnasium import spaces
+except ImportError:  # gymnasium é opcional: sem ele o ambiente só não declara os spaces
+    spaces = None
+
+# planos da observação
+WALLS = 0
+PELLETS = 1
+POWER_PELLETS = 2
+GATE = 3
+BLINKY, INKY, PINKY, CLYDE = 4, 5, 6, 7
+FRIGHTENED = 8   # fantasmas azuis (comíveis)
+DEAD = 9         # olhos voltando para a casa
+PLAYER = 10
+N_PLANES = 11
+
+# ações: 0:R, 1:L, 2:U, 3:D e 4 mantém o comando atual
+NOOP = 4
+N_ACTIONS = 5
+
+
+class PacmanEnv:
+    def __init__(self, board=None, max_steps=MAX_FRAMES, obs=None, planes=True):
+        # obs: array (N_PLANES, linhas, colunas) uint8 já alocado onde escrever as
+        # observações (ex.: um pedaço de memória compartilhada, ver vector_env.py).
+        # planes=False: subclasses com outra observação (pixel_env.py) não pagam pelos planos
+        self.sim = Simulation(board)
+        self.max_steps = max_steps
+        level = self.sim.level
+        self.rows, self.cols = level.rows, level.cols
+        self.obs = self._flat = None
+        if planes:
+            if obs is None:
+                obs = np.zeros((N_PLANES, self.rows, self.cols), dtype=np.uint8)
+            elif obs.shape != (N_PLANES, self.rows, self.cols) or obs.dtype != np.uint8:
+                raise ValueError(f'obs precisa ser uint8 {(N_PLANES, self.rows, self.cols)}, veio {obs.dtype} {obs.shape}')
+            else:
+                obs[:] = 0
+            self.obs = obs
+            # paredes e portão não mudam: preenchidos uma vez só
+            self.obs[WALLS] = np.frombuffer(level.walls, dtype=np.uint8).reshape(self.rows, self.cols)
+            self.obs[GATE] = np.frombuffer(level.gate, dtype=np.uint8).reshape(self.rows, self.cols)
+            self._flat = self.obs.reshape(N_PLANES, -1)
+        # tiles marcados no último step, por plano de ator, para apagar no próximo
+        self._marked = []
+        self._cleared_seen = None
+        self._last_score = 0
+        self.steps = 0
+        self.info = {}
+        if spaces is not None:
+            if planes:
+                self.observation_space = spaces.Box(0, 1, self.obs.shape, dtype=np.uint8)
+            self.action_space = spaces.Discrete(N_ACTIONS)
+
+    def _tile(self, center_x, center_y):
+        # tile do centro, preso ao tabuleiro (no túnel o centro sai da tela)
+        num1, num2 = _tile_sizes()
+        col = min(max(center_x // num2, 0), self.cols - 1)
+        row = min(max(center_y // num1, 0), self.rows - 1)
+        return row * self.cols + col
+
+    def _sync_pellets(self):
+        sim = self.sim
+        if self._cleared_seen is None or self._cleared_seen[0] is not sim.cleared_tiles:
+            # reset/restore: refaz os planos de pellets a partir do tabuleiro
+            board = sim.level.array()
+            np.equal(board, 1, out=self.obs[PELLETS].view(np.bool_))
+            np.equal(board, 2, out=self.obs[POWER_PELLETS].view(np.bool_))
+            self._cleared_seen = (sim.cleared_tiles, len(sim.cleared_tiles))
+            return
+        cleared, seen = self._cleared_seen
+        for row, col in cleared[seen:]:
+            self.obs[PELLETS, row, col] = 0
+            self.obs[POWER_PELLETS, row, col] = 0
+        self._cleared_seen = (cleared, len(cleared))
+
+    def _sync_actors(self):
+        sim = self.sim
+        flat = self._flat
+        for plane, i in self._marked:
+            flat[plane, i] = 0
+        marked = self._marked
+        marked.clear()
+        i = self._tile(sim.player_x + 23, sim.player_y + 24)
+        flat[PLAYER, i] = 1
+        marked.append((PLAYER, i))
+        ghosts = ((sim.blinky_x, sim.blinky_y, sim.blinky_dead), (sim.inky_x, sim.inky_y, sim.inky_dead),
+                  (sim.pinky_x, sim.pinky_y, sim.pinky_dead), (sim.clyde_x, sim.clyde_y, sim.clyde_dead))
+        for g, (x, y, dead) in enumerate(ghosts):
+            i = self._tile(x + 22, y + 22)
+            flat[BLINKY + g, i] = 1
+            marked.append((BLINKY + g, i))
+            # mesmo critério de draw_ghost para o fantasma azul
+            if dead:
+                flat[DEAD, i] = 1
+                marked.append((DEAD, i))
+            elif sim.powerup and not sim.eaten_ghost[g]:
+                flat[FRIGHTENED, i] = 1
+                marked.append((FRIGHTENED, i))
+
+    def _observe(self):
+        self._sync_pellets()
+        self._sync_actors()
+        sim = self.sim
+        info = self.info
+        info['score'] = sim.score
+        info['lives'] = sim.lives
+        info['frame'] = sim.frame
+        info['pellets_left'] = sim.pellets_left
+        return self.obs
+
+    def reset(self, seed=None, options=None):
+        # o jogo é determinístico: seed só existe pela interface do Gymnasium
+        self.sim.reset()
+        self._last_score = self.sim.score
+        self.steps = 0
+        return self._observe(), self.info
+
+    def step(self, action):
+        sim = self.sim
+        sim.step(None if action == NOOP else int(action))
+        self.steps += 1
+        reward = sim.score - self._last_score
+        self._last_score = sim.score
+        obs = self._observe()
+        return obs, reward, sim.done, self.steps >= self.max_steps, self.info
+
+    def close(self):
+        pass
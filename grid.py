@@ -0,0 +1,66 @@
+"""
+Tabuleiro compacto: todos os tiles num único bytearray, linha a linha.
+
+Board substitui a lista de listas copiada com deepcopy. board[linha][coluna]
+continua funcionando (cada linha é um memoryview sobre o mesmo buffer, com
+índices negativos como na lista original), mas quem quiser velocidade usa
+board.cells e board.index(linha, coluna) direto. As máscaras de parede, área
+andável e portão vêm do molde imutável e não mudam durante a partida, e reset()
+é uma única cópia do molde por cima do buffer.
+"""
+import hashlib
+
+
+class Board:
+    __slots__ = ('rows', 'cols', 'template', 'cells', 'walls', 'walkable', 'gate', 'passable',
+                 'pellet_total', 'distance_table', '_row_views')
+
+    def __init__(self, layout):
+        if isinstance(layout, Board):
+            self.rows, self.cols, self.template = layout.rows, layout.cols, layout.template
+        else:
+            self.rows, self.cols = len(layout), len(layout[0])
+            self.template = bytes(tile for row in layout for tile in row)
+        self.cells = bytearray(self.template)
+        view = memoryview(self.cells)
+        self._row_views = [view[r * self.cols:(r + 1) * self.cols] for r in range(self.rows)]
+        # máscaras 0/1 por tile, mesma ordem de cells
+        self.walls = bytes(1 if 3 <= tile <= 8 else 0 for tile in self.template)
+        self.walkable = bytes(1 if tile < 3 else 0 for tile in self.template)
+        self.gate = bytes(1 if tile == 9 else 0 for tile in self.template)
+        # onde um fantasma pode andar com o portão aberto
+        self.passable = bytes(w | g for w, g in zip(self.walkable, self.gate))
+        self.pellet_total = self.template.count(1) + self.template.count(2)
+        # cache de maze_distances.distance_table_for; vale para todo Board do mesmo molde
+        self.distance_table = layout.distance_table if isinstance(layout, Board) else None
+
+    def reset(self):
+        self.cells[:] = self.template
+
+    def index(self, row, col):
+        return row * self.cols + col
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, row):
+        return self._row_views[row]
+
+    def __iter__(self):
+        return iter(self._row_views)
+
+    def wall_key(self):
+        # o tabuleiro sem pellets: identifica o layout de paredes (ver move_table_for)
+        return self.cols, bytes(0 if tile in (1, 2) else tile for tile in self.template)
+
+    def digest(self):
+        # identifica o tabuleiro inicial (molde), não o estado atual dos pellets
+        return hashlib.sha1(bytes((self.rows, self.cols)) + self.template).digest()
+
+    def to_lists(self):
+        return [list(row) for row in self._row_views]
+
+    def array(self):
+        # visão NumPy (linhas, colunas) do mesmo buffer, sem cópia
+        import numpy as np
+        return np.frombuffer(self.cells, dtype=np.uint8).reshape(self.rows, self.cols)
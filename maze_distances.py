@@ -0,0 +1,188 @@
+"""
+Distâncias e próximos passos entre todos os pares de tiles andáveis do tabuleiro.
+
+Um BFS a partir de cada tile andável (pellets, vazio e o portão 9), com a volta
+pelo túnel, gera duas matrizes compactas do NumPy: `dist` em tiles e `next_hop`
+com o primeiro passo do caminho mais curto. As matrizes ficam em cache no disco,
+com o hash do tabuleiro no nome do arquivo, então só são recalculadas quando o
+tabuleiro muda. Distância vira uma consulta O(1) e caminho O(comprimento).
+"""
+import os
+import zipfile
+import hashlib
+import tempfile
+from collections import deque
+import numpy as np
+from assets.board import boards
+from grid import Board
+from simulation import _tile_sizes, _tile_center
+
+UNREACHABLE = 0xFFFF
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+# muda quando o formato dos arquivos em cache muda
+_FORMAT = 1
+
+
+def board_hash(board):
+    if isinstance(board, Board):
+        # o molde: pellets comidos não mudam por onde se anda
+        data = np.frombuffer(board.template, dtype=np.uint8).reshape(board.rows, board.cols)
+    else:
+        data = np.asarray(board, dtype=np.uint8)
+    digest = hashlib.sha1(f'{_FORMAT}:{data.shape}:'.encode())
+    digest.update(data.tobytes())
+    return digest.hexdigest()
+
+
+def _walkable(tile):
+    return tile < 3 or tile == 9
+
+
+class DistanceTable:
+    def __init__(self, index, tiles, dist, next_hop):
+        self.index = index          # (linhas, colunas) int16: tile -> índice, -1 nas paredes
+        self.tiles = tiles          # (T, 2) int16: índice -> (coluna, linha)
+        self.dist = dist            # (T, T) uint16, UNREACHABLE sem caminho
+        self.next_hop = next_hop    # (T, T) int16: primeiro passo de a até b, -1 sem caminho
+        # path() anda em listas do Python: indexar o NumPy escalar por escalar é lento
+        self._tile_list = [tuple(tile) for tile in tiles.tolist()]
+
+    @classmethod
+    def build(cls, board):
+        h, w = len(board), len(board[0])
+        index = np.full((h, w), -1, dtype=np.int16)
+        tiles = [(c, r) for r in range(h) for c in range(w) if _walkable(board[r][c])]
+        for i, (c, r) in enumerate(tiles):
+            index[r, c] = i
+        neighbors = []
+        for c, r in tiles:
+            adj = []
+            # na horizontal o túnel dá a volta na tela
+            for nc, nr in (((c + 1) % w, r), ((c - 1) % w, r), (c, r - 1), (c, r + 1)):
+                if 0 <= nr < h and index[nr, nc] >= 0:
+                    adj.append(int(index[nr, nc]))
+            neighbors.append(adj)
+
+        n = len(tiles)
+        dist = np.full((n, n), UNREACHABLE, dtype=np.uint16)
+        next_hop = np.full((n, n), -1, dtype=np.int16)
+        for src in range(n):
+            d_row = [UNREACHABLE] * n
+            first = [-1] * n
+            d_row[src] = 0
+            first[src] = src
+            queue = deque([src])
+            while queue:
+                cur = queue.popleft()
+                for nxt in neighbors[cur]:
+                    if d_row[nxt] == UNREACHABLE:
+                        d_row[nxt] = d_row[cur] + 1
+                        # o primeiro passo é herdado de quem descobriu o tile
+                        first[nxt] = nxt if cur == src else first[cur]
+                        queue.append(nxt)
+            dist[src] = d_row
+            next_hop[src] = first
+        return cls(index, np.array(tiles, dtype=np.int16).reshape(-1, 2), dist, next_hop)
+
+    def save(self, path):
+        # nome temporário único: vários workers (runner, vector_env) podem gravar ao mesmo tempo
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or '.', prefix='distances-',
+                                         suffix='.tmp.npz', delete=False) as f:
+            tmp = f.name
+            np.savez_compressed(f, index=self.index, tiles=self.tiles, dist=self.dist, next_hop=self.next_hop)
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['index'], data['tiles'], data['dist'], data['next_hop'])
+
+    @classmethod
+    def try_load(cls, path):
+        # None se o arquivo não existe ou está truncado/corrompido (ex.: gravação interrompida)
+        try:
+            return cls.load(path)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            return None
+
+    def _idx(self, tile):
+        col, row = tile
+        if 0 <= row < self.index.shape[0] and 0 <= col < self.index.shape[1]:
+            return int(self.index[row, col])
+        return -1
+
+    def has_tile(self, tile):
+        # tile (coluna, linha) andável, com linha e coluna na tabela
+        return self._idx(tile) >= 0
+
+    def distance(self, a, b):
+        # distância em tiles entre (coluna, linha) a e b, ou None se não houver caminho
+        i, j = self._idx(a), self._idx(b)
+        if i < 0 or j < 0 or self.dist[i, j] == UNREACHABLE:
+            return None
+        return int(self.dist[i, j])
+
+    def next_tile(self, a, b):
+        i, j = self._idx(a), self._idx(b)
+        if i < 0 or j < 0 or self.next_hop[i, j] < 0:
+            return None
+        return tuple(int(v) for v in self.tiles[self.next_hop[i, j]])
+
+    def path(self, a, b):
+        # tiles de a até b (inclusive), seguindo next_hop; [] se não houver caminho
+        i, j = self._idx(a), self._idx(b)
+        if i < 0 or j < 0 or self.next_hop[i, j] < 0:
+            return []
+        hops = self.next_hop[:, j].tolist()
+        tiles = self._tile_list
+        path = [tiles[i]]
+        while i != j:
+            i = hops[i]
+            path.append(tiles[i])
+        return path
+
+    def pixel_tile(self, pos):
+        # (coluna, linha) do tile sob a posição em pixels; no túnel a coluna dá a volta
+        num1, num2 = _tile_sizes()
+        return int(pos[0] // num2) % self.index.shape[1], int(pos[1] // num1)
+
+    def path_centers(self, start, goal):
+        # mesmo formato de a_star_path: posições em pixels -> centros dos tiles
+        return [_tile_center(c, r) for c, r in self.path(self.pixel_tile(start), self.pixel_tile(goal))]
+
+
+# tabelas já carregadas neste processo, por hash do tabuleiro
+_tables = {}
+
+
+def distance_table_for(board=None, cache_dir=CACHE_DIR):
+    board = boards if board is None else board
+    if isinstance(board, Board) and board.distance_table is not None:
+        # já resolvida para este molde: nem precisa do hash
+        return board.distance_table
+    key = board_hash(board)
+    table = _tables.get(key)
+    if table is not None:
+        if isinstance(board, Board):
+            board.distance_table = table
+        return table
+    path = os.path.join(cache_dir, f'distances-{key}.npz') if cache_dir else None
+    table = DistanceTable.try_load(path) if path and os.path.exists(path) else None
+    if table is None:
+        # sem cache, ou cache ilegível: recalcula e grava por cima
+        table = DistanceTable.build(board)
+        if path:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                table.save(path)
+            except OSError:
+                # sem permissão de escrita (ex.: executável do PyInstaller); fica só em memória
+                pass
+    _tables[key] = table
+    if isinstance(board, Board):
+        board.distance_table = table
+    return table
@@ -0,0 +1,366 @@
+"""
+Grafo de junções do labirinto: só os tiles onde dá para escolher caminho viram nós.
+
+Num corredor (inclusive nas curvas) um fantasma não tem escolha nenhuma: só
+segue em frente. O grafo guarda como nós os tiles andáveis com três ou mais
+vizinhos (e os becos) e, como arestas, os corredores entre eles, com o
+comprimento em pixels (30 por passo na horizontal, 28 na vertical). Cada
+corredor vira duas arestas dirigidas, uma por sentido.
+
+Tipos de aresta:
+- 'corridor': corredor comum;
+- 'tunnel': passa pela volta horizontal da tela (linha 15);
+- 'gate': atravessa o portão 9 da casa dos fantasmas, que só é cruzado na
+  vertical e só vale para fantasma na casa ou morto.
+
+Quem anda pelo grafo usa um EdgeWalker: advance(pixels) só soma o deslocamento
+e avisa quando o ator chega ao nó do fim da aresta; a decisão (qual saída
+pegar) fica para esse momento. Caminho mais curto é Dijkstra sobre os nós, com
+as distâncias entre todos os pares de nós calculadas uma vez.
+
+Tiles cercados por paredes, que nenhum ator alcança, ficam fora do grafo.
+"""
+import heapq
+from bisect import bisect_right
+from assets.board import boards
+from simulation import WIDTH, PLAYER_START, _tile_sizes, _tile_center
+from maze_distances import board_hash, _walkable
+
+GATE = 9
+# mesmas direções da Simulation: 0 direita, 1 esquerda, 2 cima, 3 baixo
+STEPS = ((1, 0), (-1, 0), (0, -1), (0, 1))
+INF = float('inf')
+
+
+def _reverse(d):
+    return d ^ 1
+
+
+class Edge:
+    __slots__ = ('src', 'dst', 'direction', 'arrival', 'length', 'kind', 'tiles', 'offsets', 'points', 'reverse')
+
+    def __init__(self, src, dst, direction, arrival, kind, tiles, offsets, points):
+        self.src = src                  # nó de origem
+        self.dst = dst                  # nó de chegada
+        self.direction = direction      # direção do primeiro passo, saindo de src
+        self.arrival = arrival          # direção do último passo, entrando em dst
+        self.length = offsets[-1]       # pixels de centro a centro
+        self.kind = kind
+        self.tiles = tiles              # (coluna, linha) de src até dst, inclusive
+        self.offsets = offsets          # pixels do início da aresta até cada tile
+        self.points = points            # centros dos tiles, sem a volta do túnel
+        self.reverse = -1               # a mesma aresta no outro sentido
+
+    def position(self, offset):
+        # centro em pixels a offset pixels do início (x já com a volta do túnel)
+        offsets = self.offsets
+        k = bisect_right(offsets, offset) - 1
+        if k >= len(offsets) - 1:
+            x, y = self.points[-1]
+        else:
+            x0, y0 = self.points[k]
+            x1, y1 = self.points[k + 1]
+            t = (offset - offsets[k]) / (offsets[k + 1] - offsets[k])
+            x, y = x0 + (x1 - x0) * t, y0 + (y1 - y0) * t
+        return x % WIDTH, y
+
+    def __repr__(self):
+        return f'Edge({self.src}->{self.dst}, {self.kind}, {self.length}px)'
+
+
+class MazeGraph:
+    def __init__(self, nodes, edges, tile_edges, cols, gates=frozenset()):
+        self.cols = cols
+        self.gates = gates                                  # tiles (coluna, linha) do portão
+        self.nodes = nodes                                  # id -> (coluna, linha)
+        self.node_at = {tile: i for i, tile in enumerate(nodes)}
+        self.edges = edges
+        # saídas de cada nó indexadas pela direção (None onde há parede)
+        self.exits = [[None] * 4 for _ in nodes]
+        for e, edge in enumerate(edges):
+            self.exits[edge.src][edge.direction] = e
+        # tile no meio de um corredor -> (aresta, offset) no sentido src->dst
+        self.tile_edges = tile_edges
+        self._dist = {}
+
+    @classmethod
+    def build(cls, board):
+        h, w = len(board), len(board[0])
+        num1, num2 = _tile_sizes()
+
+        def neighbor(c, r, d):
+            dc, dr = STEPS[d]
+            nc, nr = (c + dc) % w, r + dr
+            if not 0 <= nr < h or not _walkable(board[nr][nc]):
+                return None
+            # o portão só é atravessado na vertical
+            if dr == 0 and (board[r][c] == GATE or board[nr][nc] == GATE):
+                return None
+            return nc, nr
+
+        # só o que se alcança a partir do início do pacman (a casa entra pelo portão)
+        start = (PLAYER_START[0] + 23) // num2, (PLAYER_START[1] + 24) // num1
+        reach = {start}
+        stack = [start]
+        while stack:
+            c, r = stack.pop()
+            for d in range(4):
+                nxt = neighbor(c, r, d)
+                if nxt is not None and nxt not in reach:
+                    reach.add(nxt)
+                    stack.append(nxt)
+
+        moves = {tile: [d for d in range(4) if neighbor(*tile, d) is not None] for tile in reach}
+        nodes = sorted((tile for tile, ds in moves.items() if len(ds) != 2), key=lambda t: (t[1], t[0]))
+        node_at = {tile: i for i, tile in enumerate(nodes)}
+
+        edges = []
+        tile_edges = {}
+        for src, tile in enumerate(nodes):
+            for first in moves[tile]:
+                c, r = tile
+                d = first
+                tiles = [tile]
+                offsets = [0]
+                x, y = _tile_center(c, r)
+                points = [(x, y)]
+                wrapped = gate = False
+                while True:
+                    dc, dr = STEPS[d]
+                    nc, nr = neighbor(c, r, d)
+                    if nc != c + dc:
+                        wrapped = True
+                    c, r = nc, nr
+                    x, y = x + dc * num2, y + dr * num1
+                    tiles.append((c, r))
+                    offsets.append(offsets[-1] + (num2 if dr == 0 else num1))
+                    points.append((x, y))
+                    gate = gate or board[r][c] == GATE
+                    if (c, r) in node_at:
+                        break
+                    # corredor: a única saída que não é voltar
+                    d = next(k for k in moves[(c, r)] if k != _reverse(d))
+                kind = 'gate' if gate or board[tile[1]][tile[0]] == GATE else 'tunnel' if wrapped else 'corridor'
+                e = len(edges)
+                edges.append(Edge(src, node_at[(c, r)], first, d, kind, tuple(tiles), tuple(offsets), tuple(points)))
+                for k in range(1, len(tiles) - 1):
+                    tile_edges.setdefault(tiles[k], (e, offsets[k]))
+
+        # par de cada aresta: sai do nó de chegada pelo sentido contrário
+        exits = {(edge.src, edge.direction): e for e, edge in enumerate(edges)}
+        for edge in edges:
+            edge.reverse = exits[(edge.dst, _reverse(edge.arrival))]
+        gates = frozenset(tile for tile in reach if board[tile[1]][tile[0]] == GATE)
+        return cls(nodes, edges, tile_edges, w, gates)
+
+    def exits_from(self, node, gate=False):
+        """(direção, aresta) das saídas de node; arestas do portão só com gate=True."""
+        edges = self.edges
+        return [(d, e) for d, e in enumerate(self.exits[node])
+                if e is not None and (gate or edges[e].kind != 'gate')]
+
+    def locate(self, tile, gate=False):
+        """
+        Onde fica um tile (coluna, linha) no grafo: (nó, None, 0) num nó,
+        (None, aresta, offset) no meio de um corredor, ou None fora do labirinto
+        (o portão só conta com gate=True).
+        """
+        if not gate and tile in self.gates:
+            return None
+        node = self.node_at.get(tile)
+        if node is not None:
+            return node, None, 0
+        found = self.tile_edges.get(tile)
+        if found is None:
+            return None
+        return None, found[0], found[1]
+
+    def walker_at(self, tile, direction, gate=False):
+        """
+        EdgeWalker num tile, andando em direction; None se não há aresta nesse
+        sentido ou, com gate=False, se o resto dela passa pelo portão.
+        """
+        where = self.locate(tile, gate)
+        if where is None:
+            return None
+        node, e, offset = where
+        if node is not None:
+            e = self.exits[node][direction]
+            if e is None or (not gate and self.edges[e].kind == 'gate'):
+                return None
+            return EdgeWalker(self, e)
+        edge = self.edges[e]
+        # a aresta guardada vai num sentido só; no outro, o offset é contado do outro nó
+        k = edge.offsets.index(offset)
+        dc, dr = STEPS[direction]
+        step = (tile[0] + dc) % self.cols, tile[1] + dr
+        if edge.tiles[k + 1] == step:
+            ahead = edge.tiles[k + 1:]
+            walker = EdgeWalker(self, e, offset)
+        elif edge.tiles[k - 1] == step:
+            ahead = edge.tiles[:k]
+            walker = EdgeWalker(self, edge.reverse, edge.length - offset)
+        else:
+            return None
+        if not gate and edge.kind == 'gate' and not self.gates.isdisjoint(ahead):
+            return None
+        return walker
+
+    def distances(self, src, gate=False):
+        """Distância em pixels de src até cada nó (Dijkstra); INF sem caminho."""
+        key = (src, gate)
+        dist = self._dist.get(key)
+        if dist is not None:
+            return dist
+        edges = self.edges
+        dist = [INF] * len(self.nodes)
+        dist[src] = 0
+        heap = [(0, src)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > dist[node]:
+                continue
+            for e in self.exits[node]:
+                if e is None:
+                    continue
+                edge = edges[e]
+                if edge.kind == 'gate' and not gate:
+                    continue
+                nd = d + edge.length
+                if nd < dist[edge.dst]:
+                    dist[edge.dst] = nd
+                    heapq.heappush(heap, (nd, edge.dst))
+        self._dist[key] = dist
+        return dist
+
+    def path(self, src, dst, gate=False):
+        """Arestas do caminho mais curto de src até dst; [] se src == dst ou sem caminho."""
+        dist = self.distances(dst, gate)
+        if dist[src] == INF:
+            return []
+        # as arestas são simétricas: desce pela distância até dst
+        edges = self.edges
+        path = []
+        node = src
+        while node != dst:
+            best = None
+            for _, e in self.exits_from(node, gate):
+                edge = edges[e]
+                if edge.length + dist[edge.dst] == dist[node]:
+                    best = e
+                    break
+            path.append(best)
+            node = edges[best].dst
+        return path
+
+    def _crosses_gate(self, e, lo, hi, gate):
+        # o trecho da aresta e entre os offsets lo e hi passa pelo portão (e não vale)
+        edge = self.edges[e]
+        if gate or edge.kind != 'gate':
+            return False
+        offsets = edge.offsets
+        return any(tile in self.gates for tile, offset in zip(edge.tiles, offsets) if lo <= offset <= hi)
+
+    def _anchors(self, where, gate):
+        # nós mais próximos de um tile (já localizado) e quanto falta até cada um
+        node, e, offset = where
+        if node is not None:
+            return ((node, 0),)
+        edge = self.edges[e]
+        anchors = []
+        if not self._crosses_gate(e, 0, offset, gate):
+            anchors.append((edge.src, offset))
+        if not self._crosses_gate(e, offset, edge.length, gate):
+            anchors.append((edge.dst, edge.length - offset))
+        return anchors
+
+    def tile_distance(self, a, b, gate=False):
+        """Distância em pixels entre dois tiles (coluna, linha) pelo grafo; None fora do labirinto."""
+        where_a, where_b = self.locate(a, gate), self.locate(b, gate)
+        if where_a is None or where_b is None:
+            return None
+        best = INF
+        if where_a[1] is not None and where_b[1] is not None:
+            # no mesmo corredor dá para ir direto
+            (_, ea, oa), (_, eb, ob) = where_a, where_b
+            if ea == eb and not self._crosses_gate(ea, min(oa, ob), max(oa, ob), gate):
+                best = abs(oa - ob)
+        for na, da in self._anchors(where_a, gate):
+            dist = self.distances(na, gate)
+            for nb, db in self._anchors(where_b, gate):
+                best = min(best, da + dist[nb] + db)
+        return None if best == INF else best
+
+    def choose_exit(self, node, target, arrival=None, gate=False):
+        """
+        Saída de node cujo primeiro tile fica mais perto de target (pixels), sem
+        voltar pelo sentido de chegada; empate fica com a ordem das direções.
+        Escolha gulosa para bots, não a regra dos move_* dos fantasmas.
+        """
+        c, r = self.nodes[node]
+        best = best_d = None
+        for d, e in self.exits_from(node, gate):
+            if arrival is not None and d == _reverse(arrival):
+                continue
+            dc, dr = STEPS[d]
+            x, y = _tile_center((c + dc) % self.cols, r + dr)
+            dist = (x - target[0]) ** 2 + (y - target[1]) ** 2
+            if best_d is None or dist < best_d:
+                best, best_d = e, dist
+        return best
+
+
+class EdgeWalker:
+    """
+    Ator andando numa aresta. advance() não confere nada: só soma pixels e, ao
+    passar do fim, devolve o nó de chegada. O que sobrou do passo fica em
+    offset e passa para a próxima aresta em enter(); se sobrar mais que a
+    aresta nova, advance(0) avisa a chegada de novo.
+    """
+    __slots__ = ('graph', 'edge', 'offset')
+
+    def __init__(self, graph, edge, offset=0):
+        self.graph = graph
+        self.edge = edge
+        self.offset = offset
+
+    def advance(self, pixels):
+        self.offset += pixels
+        edge = self.graph.edges[self.edge]
+        if self.offset < edge.length:
+            return None
+        return edge.dst
+
+    def enter(self, edge):
+        # sai do nó de chegada pela aresta edge, levando o que sobrou do passo
+        self.offset -= self.graph.edges[self.edge].length
+        self.edge = edge
+
+    def turn_back(self):
+        edge = self.graph.edges[self.edge]
+        self.edge = edge.reverse
+        self.offset = edge.length - self.offset
+
+    @property
+    def direction(self):
+        # direção do passo em que o ator está agora
+        edge = self.graph.edges[self.edge]
+        k = min(bisect_right(edge.offsets, self.offset), len(edge.tiles) - 1)
+        (x0, y0), (x1, y1) = edge.points[k - 1], edge.points[k]
+        return (0 if x1 > x0 else 1) if y0 == y1 else (3 if y1 > y0 else 2)
+
+    def position(self):
+        return self.graph.edges[self.edge].position(self.offset)
+
+
+# grafos já montados neste processo, por hash do tabuleiro
+_graphs = {}
+
+
+def maze_graph_for(board=None):
+    board = boards if board is None else board
+    key = board_hash(board)
+    graph = _graphs.get(key)
+    if graph is None:
+        graph = _graphs[key] = MazeGraph.build(board)
+    return graph
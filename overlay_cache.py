@@ -0,0 +1,82 @@
+"""
+Superfícies dos overlays, alocadas uma vez só.
+
+Os overlays criavam e preenchiam uma superfície SRCALPHA de 900x950 a cada
+frame. Aqui elas ficam num pool por (uso, tamanho): o fundo escurecido de uma
+cor é preenchido na criação e depois só reaproveitado. TileLayer monta um
+overlay por tile uma vez e, quando o tabuleiro muda (pellet comido), refaz só
+os tiles que mudaram.
+As superfícies devolvidas são compartilhadas: só servem para blit.
+"""
+import pygame
+
+# superfícies por (chave, tamanho)
+_pool = {}
+
+# acima disso (reset, outro estado restaurado) é mais barato remontar a camada toda
+PATCH_LIMIT = 64
+
+
+def overlay_surface(key, size, fill=None):
+    """Superfície SRCALPHA do pool; fill só é aplicado quando ela é criada."""
+    surface = _pool.get((key, size))
+    if surface is None:
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        if fill is not None:
+            surface.fill(fill)
+        _pool[(key, size)] = surface
+    return surface
+
+
+def dim_layer(color, size):
+    # fundo translúcido de cor única, o mesmo em todo frame
+    return overlay_surface(('dim', color), size, color)
+
+
+class TileLayer:
+    """
+    Camada com um desenho por tile sobre um fundo fill. draw_tile(surface, tile,
+    rect) desenha o tile dentro do próprio rect; refazer um tile é preencher o
+    rect com fill e chamar draw_tile de novo.
+    """
+
+    def __init__(self, key, fill, draw_tile):
+        self.key = key
+        self.fill = fill
+        self.draw_tile = draw_tile
+        self.surface = None
+        self.level = None
+        self.cells = None
+
+    def get(self, level, size, tile_sizes):
+        surface = overlay_surface(self.key, size)
+        cells = level.cells
+        fresh = self.surface is surface and self.level is level
+        if fresh and self.cells == cells:
+            return surface
+        tile_height, tile_width = tile_sizes()
+        cols = level.cols
+        changed = None
+        if fresh:
+            old = self.cells
+            changed = [k for k in range(len(cells)) if cells[k] != old[k]]
+            if len(changed) > PATCH_LIMIT:
+                changed = None
+        patch = changed is not None
+        if not patch:
+            surface.fill(self.fill)
+            changed = range(len(cells))
+        for k in changed:
+            i, j = divmod(k, cols)
+            rect = pygame.Rect(j * tile_width, i * tile_height, tile_width, tile_height)
+            if patch:
+                surface.fill(self.fill, rect)
+            self.draw_tile(surface, cells[k], rect)
+        self.surface = surface
+        self.level = level
+        self.cells = bytes(cells)
+        return surface
+
+
+def reset():
+    _pool.clear()
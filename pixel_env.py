@@ -0,0 +1,161 @@
+"""
+Observações em pixels, renderizadas sem janela.
+
+O PixelRenderer desenha o frame do jogo (tabuleiro, pacman, fantasmas e HUD,
+com as mesmas funções do pacman.py) numa superfície fora da tela, usando o
+driver de vídeo dummy do SDL. Os pixels são lidos com surfarray.pixels3d, que
+é uma view sobre a superfície, sem cópia; a conversão para tons de cinza e a
+redução por média de área (ex.: 84x84) são feitas em NumPy direto num buffer
+pré-alocado.
+
+O PacmanPixelEnv repete cada ação por frame_skip frames e só desenha o último,
+então os frames cujos pixels ninguém vai ver não custam render.
+
+Os renderers de um processo compartilham o estado de desenho do pacman.py
+(camadas do tabuleiro, sprites): o normal é um ambiente de pixels por processo.
+"""
+import os
+import numpy as np
+from simulation import WIDTH, HEIGHT, MAX_FRAMES
+from env import PacmanEnv, NOOP, spaces
+
+# sem janela: precisa ser definido antes do pygame abrir o vídeo
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+import pacman
+
+# pesos de luminância (BT.601) em ponto fixo, soma 256
+_GRAY_WEIGHTS = np.array([77, 150, 29], dtype=np.uint32)
+
+
+def _init_pygame():
+    if not pygame.display.get_init():
+        pygame.display.init()
+    if not pygame.font.get_init():
+        pygame.font.init()
+    if pygame.display.get_surface() is None:
+        # convert_alpha dos sprites precisa de um modo de vídeo, qualquer um serve
+        pygame.display.set_mode((1, 1))
+    if not pacman.player_sprites:
+        pacman.load_assets()
+
+
+def _bins(total, out):
+    # início de cada faixa e quantos pixels ela tem, para a média de área
+    starts = (np.arange(out) * total) // out
+    sizes = np.diff(np.append(starts, total))
+    return starts, sizes
+
+
+class PixelRenderer:
+    def __init__(self, size=None, grayscale=False):
+        """size: (largura, altura) da observação, ou None para a resolução cheia."""
+        _init_pygame()
+        self.surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+        self.size = size
+        self.grayscale = grayscale
+        width, height = size if size else (WIDTH, HEIGHT)
+        self.frame = np.zeros((height, width) if grayscale else (height, width, 3), dtype=np.uint8)
+        if size:
+            self._col_starts, col_sizes = _bins(WIDTH, width)
+            self._row_starts, row_sizes = _bins(HEIGHT, height)
+            self._area = (row_sizes[:, None] * col_sizes[None, :]).astype(np.uint32)
+            if self._area.max() * 255 > 0xFFFF:
+                raise ValueError(f'size {size} pequeno demais para {WIDTH}x{HEIGHT}')
+            stops = np.append(self._row_starts[1:], HEIGHT)
+            self._row_bounds = list(zip(self._row_starts.tolist(), stops.tolist()))
+            self._rows = np.empty((height, WIDTH, 4), dtype=np.uint16)
+            # posição de R, G e B dentro dos 4 bytes do pixel (little-endian)
+            self._rgb = [shift // 8 for shift in self.surface.get_shifts()[:3]]
+
+    def draw(self, sim):
+        # as funções de desenho do pacman.py usam os globais screen e sim
+        screen, current = pacman.screen, pacman.sim
+        pacman.screen, pacman.sim = self.surface, sim
+        try:
+            pacman.draw_frame()
+        finally:
+            pacman.screen, pacman.sim = screen, current
+
+    def pixels(self):
+        """
+        View (altura, largura, 3) dos pixels da superfície, sem cópia. A superfície
+        fica travada enquanto a view existir: solte-a antes do próximo draw().
+        """
+        return pygame.surfarray.pixels3d(self.surface).transpose(1, 0, 2)
+
+    def render(self, sim):
+        """Desenha o frame de sim e devolve self.frame (sempre o mesmo array)."""
+        self.draw(sim)
+        if not self.size:
+            view = self.pixels()
+            try:
+                if self.grayscale:
+                    gray = view @ _GRAY_WEIGHTS
+                    np.right_shift(gray, 8, out=gray)
+                    np.copyto(self.frame, gray, casting='unsafe')
+                else:
+                    np.copyto(self.frame, view)
+            finally:
+                del view
+            return self.frame
+        # a redução lê o buffer cru (linha, coluna, 4 bytes): com os strides da view
+        # do pixels3d o NumPy cai no caminho lento e a média fica ~6x mais cara
+        buf = self.surface.get_buffer()
+        try:
+            raw = np.frombuffer(buf, dtype=np.uint8).reshape(HEIGHT, -1)[:, :WIDTH * 4].reshape(HEIGHT, WIDTH, 4)
+            rows = self._rows
+            # soma por faixa de linhas, em uint16 (o __init__ confere que não estoura)
+            for i, (start, stop) in enumerate(self._row_bounds):
+                np.add.reduce(raw[start:stop], axis=0, dtype=np.uint16, out=rows[i])
+        finally:
+            del raw, buf
+        sums = np.add.reduceat(rows, self._col_starts, axis=1)[:, :, self._rgb].astype(np.uint32)
+        if self.grayscale:
+            # média e cinza comutam: converte já na resolução pequena
+            gray = sums @ _GRAY_WEIGHTS
+            np.floor_divide(gray, self._area << 8, out=gray)
+            np.copyto(self.frame, gray, casting='unsafe')
+        else:
+            np.floor_divide(sums, self._area[:, :, None], out=sums)
+            np.copyto(self.frame, sums, casting='unsafe')
+        return self.frame
+
+
+class PacmanPixelEnv(PacmanEnv):
+    """
+    PacmanEnv com observação em pixels. Cada step repete a ação por frame_skip
+    frames e renderiza só o último; recompensa é a soma dos frames.
+    """
+
+    def __init__(self, board=None, max_steps=MAX_FRAMES, size=(84, 84), grayscale=True, frame_skip=4):
+        super().__init__(board, max_steps, planes=False)
+        self.renderer = PixelRenderer(size, grayscale)
+        self.frame_skip = frame_skip
+        self.observation_shape = self.renderer.frame.shape
+        if spaces is not None:
+            self.observation_space = spaces.Box(0, 255, self.observation_shape, dtype=np.uint8)
+
+    def _observe(self):
+        sim = self.sim
+        info = self.info
+        info['score'] = sim.score
+        info['lives'] = sim.lives
+        info['frame'] = sim.frame
+        info['pellets_left'] = sim.pellets_left
+        return self.renderer.render(sim)
+
+    def step(self, action):
+        sim = self.sim
+        command = None if action == NOOP else int(action)
+        for _ in range(self.frame_skip):
+            # o comando só entra no primeiro frame, como uma tecla apertada uma vez
+            sim.step(command)
+            command = None
+            if sim.done:
+                break
+        self.steps += 1
+        reward = sim.score - self._last_score
+        self._last_score = sim.score
+        obs = self._observe()
+        return obs, reward, sim.done, self.steps >= self.max_steps, self.info
@@ -0,0 +1,145 @@
+"""
+Profiler por fase do loop principal, para achar qual fase estourou os 16,7 ms
+de um frame sem precisar de um profiler externo.
+
+O loop marca o fim de cada fase com lap(nome): o tempo desde a marca anterior
+vai para aquela fase. A Simulation e o draw_frame chamam lap só quando há um
+profiler ligado (sim.lap / pacman.profiler), então desligado o custo é um if.
+Os últimos frames ficam num deque: o HUD mostra p50/p99 por fase e o
+histograma do tempo de frame, e dump_trace grava tudo no formato trace_event
+do Chrome (abrir em chrome://tracing ou ui.perfetto.dev).
+
+    python pacman.py --profile --trace trace.json
+"""
+import json
+import os
+import time
+from collections import deque
+import pygame
+from text_cache import render_text
+
+# ordem em que as fases aparecem no HUD (fases que não estão aqui vão no fim)
+PHASES = ('input', 'mode_scheduler', 'ghost_update', 'get_targets', 'check_position', 'movement',
+          'check_collisions', 'ghost_collisions', 'draw_board', 'sprites', 'hud', 'overlays',
+          'profiler_hud', 'flip')
+BUDGET_MS = 1000 / 60
+# faixas do histograma de tempo de frame, em ms; a última pega tudo acima
+HISTOGRAM_EDGES = (2, 4, 8, 12, 16.7, 25, 33, 50)
+
+
+def _percentile(values, p):
+    # values já ordenados
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+class FrameProfiler:
+    def __init__(self, frames=600, hud_every=15):
+        # cada frame: (início ns, fim ns, [(fase, início ns, duração ns), ...])
+        self.frames = deque(maxlen=frames)
+        self.hud_every = hud_every
+        self.origin = time.perf_counter_ns()
+        self._events = None
+        self._start = self._mark = 0
+        self._hud = None
+        self._hud_age = 0
+
+    def begin_frame(self):
+        self._events = []
+        self._start = self._mark = time.perf_counter_ns()
+
+    def lap(self, phase):
+        now = time.perf_counter_ns()
+        if self._events is not None:
+            self._events.append((phase, self._mark, now - self._mark))
+        self._mark = now
+
+    def end_frame(self):
+        if self._events is None:
+            return
+        self.frames.append((self._start, self._mark, self._events))
+        self._events = None
+
+    def frame_times(self):
+        return [(end - start) / 1e6 for start, end, _ in self.frames]
+
+    def stats(self):
+        """{fase: (p50 ms, p99 ms)} da janela; frames sem a fase contam como 0."""
+        totals = {}
+        for k, (_, _, events) in enumerate(self.frames):
+            for phase, _, dur in events:
+                column = totals.setdefault(phase, [0] * len(self.frames))
+                column[k] += dur
+        order = {phase: i for i, phase in enumerate(PHASES)}
+        result = {}
+        for phase in sorted(totals, key=lambda p: order.get(p, len(PHASES))):
+            values = sorted(totals[phase])
+            result[phase] = (_percentile(values, 0.5) / 1e6, _percentile(values, 0.99) / 1e6)
+        return result
+
+    def histogram(self):
+        counts = [0] * (len(HISTOGRAM_EDGES) + 1)
+        for ms in self.frame_times():
+            k = 0
+            while k < len(HISTOGRAM_EDGES) and ms >= HISTOGRAM_EDGES[k]:
+                k += 1
+            counts[k] += 1
+        return counts
+
+    def trace_events(self):
+        # eventos "X" (completos) em microssegundos; o frame inteiro numa trilha própria
+        events = []
+        for n, (start, end, phases) in enumerate(self.frames):
+            events.append({'name': f'frame {n}', 'cat': 'frame', 'ph': 'X', 'pid': 1, 'tid': 0,
+                           'ts': (start - self.origin) / 1e3, 'dur': (end - start) / 1e3})
+            for phase, t, dur in phases:
+                events.append({'name': phase, 'cat': 'phase', 'ph': 'X', 'pid': 1, 'tid': 1,
+                               'ts': (t - self.origin) / 1e3, 'dur': dur / 1e3})
+        return events
+
+    def dump_trace(self, path):
+        data = {'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def _build_hud(self):
+        stats = self.stats()
+        counts = self.histogram()
+        width = 300
+        times = sorted(self.frame_times())
+        if times:
+            stats['frame'] = (_percentile(times, 0.5), _percentile(times, 0.99))
+        height = 44 + 18 * len(stats) + 90
+        hud = pygame.Surface((width, height), pygame.SRCALPHA)
+        hud.fill((0, 0, 0, 190))
+        worst = times[-1] if times else 0.0
+        hud.blit(render_text(f'fase (ms)       p50    p99   pior {worst:.1f}', 14, 'white'), (8, 6))
+        y = 26
+        for phase, (p50, p99) in stats.items():
+            color = 'red' if p99 > BUDGET_MS else 'yellow' if p99 > BUDGET_MS / 4 else 'white'
+            hud.blit(render_text(phase, 14, color), (8, y))
+            hud.blit(render_text(f'{p50:6.2f} {p99:6.2f}', 14, color), (190, y))
+            y += 18
+        # histograma: barras proporcionais ao número de frames em cada faixa
+        y += 6
+        bar_w = (width - 16) // len(counts)
+        top = max(counts) or 1
+        over = HISTOGRAM_EDGES.index(16.7) + 1
+        for k, count in enumerate(counts):
+            h = int(50 * count / top)
+            color = (220, 60, 60) if k >= over else (80, 200, 80)
+            pygame.draw.rect(hud, color, (8 + k * bar_w, y + 50 - h, bar_w - 2, h))
+        labels = ('<2', '', '<8', '', '<17', '', '<33', '', '50+')
+        for k, label in enumerate(labels):
+            if label:
+                hud.blit(render_text(label, 12, 'white'), (8 + k * bar_w, y + 54))
+        return hud
+
+    def draw_hud(self, surface, pos=(10, 10)):
+        # remonta o painel a cada hud_every frames; entre um e outro só faz blit
+        if self._hud is None or self._hud_age >= self.hud_every:
+            self._hud = self._build_hud()
+            self._hud_age = 0
+        self._hud_age += 1
+        surface.blit(self._hud, pos)
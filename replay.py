@@ -0,0 +1,165 @@
+"""
+Gravação e reprodução determinística de partidas.
+
+O arquivo guarda só o que entra na simulação: as mudanças de direction_command,
+os toggles de overlay e os reinícios, cada um com a distância em ticks até o
+evento anterior como varint. No fim vêm o tick final e o score, para conferir.
+Como a Simulation é determinística, reproduzir os mesmos eventos no mesmo
+tabuleiro chega no mesmo estado; o replay roda headless, sem limite de fps.
+
+    python replay.py partida.pmr [outra.pmr ...] --workers 8
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from grid import Board
+from simulation import Simulation
+
+MAGIC = b'PMRP'
+VERSION = 1
+# códigos de evento: 0-3 são direction_command (0:R, 1:L, 2:U, 3:D)
+TOGGLE_DEBUG = 4
+TOGGLE_HACKER = 5
+TOGGLE_MATRIX = 6
+RESET = 7
+END = 0xFF
+
+
+class ReplayError(ValueError):
+    pass
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ReplayError('replay truncado')
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Recorder:
+    """Vai anotando os eventos de uma partida; frame é sim.frame no momento do evento."""
+
+    def __init__(self, board):
+        board = board if isinstance(board, Board) else Board(board)
+        self.data = bytearray(MAGIC)
+        self.data.append(VERSION)
+        self.data += board.digest()
+        self.last_frame = 0
+
+    def record(self, frame, code):
+        _write_varint(self.data, frame - self.last_frame)
+        self.data.append(code)
+        self.last_frame = frame
+
+    def action(self, frame, direction_command):
+        self.record(frame, direction_command)
+
+    def reset(self, frame):
+        self.record(frame, RESET)
+
+    def finish(self, frame, score):
+        self.record(frame, END)
+        _write_varint(self.data, score)
+        return bytes(self.data)
+
+    def save(self, path, sim):
+        data = self.finish(sim.frame, sim.score)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+
+def parse(data):
+    # devolve (digest do tabuleiro, [(frame, código)], frame final, score final)
+    if len(data) < 25 or data[:4] != MAGIC:
+        raise ReplayError('não é um arquivo de replay')
+    if data[4] != VERSION:
+        raise ReplayError(f'versão de replay {data[4]} não suportada')
+    digest = bytes(data[5:25])
+    pos = 25
+    frame = 0
+    events = []
+    while True:
+        delta, pos = _read_varint(data, pos)
+        if pos >= len(data):
+            raise ReplayError('replay truncado')
+        frame += delta
+        code = data[pos]
+        pos += 1
+        if code == END:
+            score, pos = _read_varint(data, pos)
+            return digest, events, frame, score
+        events.append((frame, code))
+
+
+def run(data, board=None):
+    """
+    Reproduz o replay numa Simulation nova e devolve (sim, frame esperado, score
+    esperado). Os toggles de overlay não mexem na simulação e são ignorados.
+    """
+    digest, events, end_frame, end_score = parse(data)
+    sim = Simulation(board)
+    if sim.level.digest() != digest:
+        raise ReplayError('o replay foi gravado em outro tabuleiro')
+    pending = None
+    for frame, code in events + [(end_frame, END)]:
+        while sim.frame < frame:
+            if sim.done:
+                raise ReplayError(f'partida terminou no tick {sim.frame}, antes do próximo evento')
+            sim.step(pending)
+            pending = None
+        if code < 4:
+            pending = code
+        elif code == RESET:
+            sim.reset()
+    return sim, end_frame, end_score
+
+
+def verify(path):
+    # (caminho, ok, mensagem), para rodar em lote
+    try:
+        with open(path, 'rb') as f:
+            sim, end_frame, end_score = run(f.read())
+    except (OSError, ReplayError) as e:
+        return path, False, str(e)
+    if sim.frame != end_frame or sim.score != end_score:
+        return path, False, (f'esperado tick {end_frame} score {end_score}, '
+                             f'obtido tick {sim.frame} score {sim.score}')
+    return path, True, f'tick {sim.frame} score {sim.score}'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Confere replays gravados com pacman.py --record.')
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    t = time.perf_counter()
+    if args.workers > 1:
+        with ProcessPoolExecutor(args.workers) as pool:
+            results = list(pool.map(verify, args.paths, chunksize=8))
+    else:
+        results = [verify(path) for path in args.paths]
+    failed = 0
+    for path, ok, msg in results:
+        if not ok:
+            failed += 1
+            print(f'FALHOU {path}: {msg}')
+    print(f'{len(results) - failed}/{len(results)} replays ok em {time.perf_counter() - t:.2f}s')
+    sys.exit(1 if failed else 0)
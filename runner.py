@@ -0,0 +1,123 @@
+"""
+Roda episódios completos do jogo em paralelo, um pool de processos com uma
+Simulation por worker.
+
+Os resultados de cada episódio vão direto para um buffer NumPy em memória
+compartilhada (multiprocessing.shared_memory); os workers só devolvem quantos
+episódios terminaram, então nada é serializado por episódio.
+
+    python runner.py --episodes 10000 --workers 32
+"""
+import os
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from simulation import Simulation, MAX_FRAMES
+
+RESULT_DTYPE = np.dtype([
+    ('score', np.int64),
+    ('pellets_eaten', np.int32),
+    ('lives_lost', np.int32),
+    ('frames', np.int64),
+    ('ghosts_eaten', np.int32),
+])
+
+
+def random_policy(sim, rng):
+    # troca de direção de vez em quando, como um jogador aleatório
+    if rng.random() < 0.03:
+        return rng.randrange(4)
+    return None
+
+
+def run_episode(sim, policy, rng, max_frames=MAX_FRAMES, hold=1):
+    # hold > 1: a policy só é consultada a cada hold frames e Simulation.advance
+    # pula a largada congelada entre uma consulta e outra
+    sim.reset()
+    lives = sim.lives
+    frames = 0
+    while not sim.done and frames < max_frames:
+        if hold == 1:
+            sim.step(policy(sim, rng))
+            frames += 1
+        else:
+            frames += sim.advance(min(hold, max_frames - frames), policy(sim, rng))
+    lives_lost = lives - sim.lives + int(sim.game_over)
+    return sim.score, sim.pellets_eaten, lives_lost, frames, sim.ghosts_eaten
+
+
+# estado de cada processo do pool, montado uma única vez em _init_worker
+_worker = {}
+
+
+def _init_worker(shm_name, n_episodes, policy, max_frames, seed, hold):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker['shm'] = shm
+    _worker['results'] = np.ndarray((n_episodes,), dtype=RESULT_DTYPE, buffer=shm.buf)
+    _worker['sim'] = Simulation()
+    _worker['policy'] = policy
+    _worker['max_frames'] = max_frames
+    _worker['seed'] = seed
+    _worker['hold'] = hold
+
+
+def _run_chunk(start, stop):
+    sim, results = _worker['sim'], _worker['results']
+    for i in range(start, stop):
+        # semente por episódio: o resultado não depende de qual worker rodou
+        rng = random.Random(_worker['seed'] * 1000003 + i)
+        results[i] = run_episode(sim, _worker['policy'], rng, _worker['max_frames'], _worker['hold'])
+    return stop - start
+
+
+def run_episodes(n_episodes, workers=None, policy=random_policy, max_frames=MAX_FRAMES, seed=0, chunk_size=None,
+                 hold=1):
+    """
+    Roda n_episodes episódios em `workers` processos e devolve um array
+    estruturado RESULT_DTYPE com uma linha por episódio. policy(sim, rng)
+    precisa ser uma função de módulo (picklable) que devolve a próxima
+    direction_command ou None; com hold > 1 ela vale por hold frames.
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        # pedaços pequenos o bastante para balancear, grandes o bastante para
+        # não pagar o overhead do executor por episódio
+        chunk_size = max(1, n_episodes // (workers * 8))
+    shm = shared_memory.SharedMemory(create=True, size=max(1, n_episodes * RESULT_DTYPE.itemsize))
+    try:
+        results = np.ndarray((n_episodes,), dtype=RESULT_DTYPE, buffer=shm.buf)
+        results[:] = 0
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(shm.name, n_episodes, policy, max_frames, seed, hold)) as pool:
+            futures = [pool.submit(_run_chunk, start, min(start + chunk_size, n_episodes))
+                       for start in range(0, n_episodes, chunk_size)]
+            for future in futures:
+                future.result()
+        out = results.copy()
+        del results
+    finally:
+        shm.close()
+        shm.unlink()
+    return out
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Roda episódios headless em paralelo.')
+    parser.add_argument('--episodes', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-frames', type=int, default=MAX_FRAMES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--hold', type=int, default=1,
+                        help='frames por decisão da policy (>1 usa Simulation.advance)')
+    args = parser.parse_args()
+
+    t = time.perf_counter()
+    res = run_episodes(args.episodes, args.workers, max_frames=args.max_frames, seed=args.seed, hold=args.hold)
+    elapsed = time.perf_counter() - t
+    print(f'{len(res)} episódios em {elapsed:.2f}s '
+          f'({res["frames"].sum() / elapsed:.0f} frames/s, {len(res) / elapsed:.1f} episódios/s)')
+    for field in RESULT_DTYPE.names:
+        print(f'  {field:>14}: média {res[field].mean():.1f}  máx {res[field].max()}')
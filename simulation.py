@@ -0,0 +1,1377 @@
+"""
+Núcleo headless do jogo: todo o estado e a lógica de um frame, sem pygame.
+
+O pacman.py é só um renderer que chama Simulation.step() uma vez por frame e
+desenha o estado resultante. Bots e testes de carga podem usar a Simulation
+diretamente, sem janela.
+"""
+import math
+import struct
+from operator import attrgetter
+from bisect import bisect_right
+from assets.board import boards
+from grid import Board
+
+WIDTH = 900
+HEIGHT = 950
+FPS = 60
+
+PLAYER_START = (450, 663)
+# (x, y, direção) iniciais de blinky, inky, pinky e clyde
+GHOST_STARTS = [(56, 58, 0), (440, 388, 2), (440, 438, 2), (440, 438, 2)]
+
+# Pellets e modos de fantasmas
+ELROY_PELLETS = 60
+INKY_RELEASE_PELLETS = 15
+CLYDE_RELEASE_PELLETS = 30
+# Clyde fica menos agressivo quando está mais próximo que este raio (em tiles)
+CLYDE_SCATTER_RADIUS_TILES = 8.0
+
+# Scheduler de scatter/chase (s)
+mode_schedule = [
+    ('scatter', 5), ('chase', 25),
+    ('scatter', 5), ('chase', 25),
+    ('scatter', 3), ('chase', 30),
+    ('scatter', 1), ('chase', 9999),
+]
+
+
+def _reverse_dir(d):
+    return {0:1, 1:0, 2:3, 3:2}.get(d, d)
+
+
+def _tile_sizes():
+    num1 = (HEIGHT - 50) // 32
+    num2 = WIDTH // 30
+    return num1, num2
+
+
+def _tile_center(col, row):
+    num1, num2 = _tile_sizes()
+    return int(col * num2 + (0.5 * num2)), int(row * num1 + (0.5 * num1))
+
+
+# meia altura do retângulo que o pygame.draw.circle (raio 20, largura 2) devolve,
+# pela largura visível do círculo: no túnel sobra só a ponta do anel e o
+# retângulo encolhe também na altura (valores medidos do próprio pygame)
+_PLAYER_HALF_HEIGHT = (0, 4, 7, 9, 11, 12, 13, 14, 15, 16, 17, 17, 18, 18, 19, 19, 19) + (20,) * 24
+
+
+def _player_rect(center_x, center_y):
+    # mesmo retângulo que pygame.draw.circle(screen, ..., (cx, cy), 20, 2) devolve,
+    # inclusive o recorte na borda da tela quando o pacman está no túnel
+    left = max(center_x - 20, 0)
+    right = min(center_x + 20, WIDTH)
+    if right <= left:
+        return (center_x, center_y, 0, 0)
+    half = _PLAYER_HALF_HEIGHT[right - left]
+    return (left, center_y - half, right - left, 2 * half)
+
+
+def _colliderect(a, b):
+    # mesma regra do pygame.Rect.colliderect (retângulos vazios nunca colidem)
+    if a[2] <= 0 or a[3] <= 0 or b[2] <= 0 or b[3] <= 0:
+        return False
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+def probe_ghost_turns(level, center_x, center_y, direction, gate):
+    # R, L, U, D; gate diz se o fantasma pode atravessar o portão (9)
+    num1 = ((HEIGHT - 50) // 32)
+    num2 = (WIDTH // 30)
+    num3 = 15
+    turns = [False, False, False, False]
+    if 0 < center_x // 30 < 29:
+        if level[(center_y - num3) // num1][center_x // num2] == 9:
+            turns[2] = True
+        if level[center_y // num1][(center_x - num3) // num2] < 3 \
+                or (level[center_y // num1][(center_x - num3) // num2] == 9 and gate):
+            turns[1] = True
+        if level[center_y // num1][(center_x + num3) // num2] < 3 \
+                or (level[center_y // num1][(center_x + num3) // num2] == 9 and gate):
+            turns[0] = True
+        if level[(center_y + num3) // num1][center_x // num2] < 3 \
+                or (level[(center_y + num3) // num1][center_x // num2] == 9 and gate):
+            turns[3] = True
+        if level[(center_y - num3) // num1][center_x // num2] < 3 \
+                or (level[(center_y - num3) // num1][center_x // num2] == 9 and gate):
+            turns[2] = True
+
+        if direction == 2 or direction == 3:
+            if 12 <= center_x % num2 <= 18:
+                if level[(center_y + num3) // num1][center_x // num2] < 3 \
+                        or (level[(center_y + num3) // num1][center_x // num2] == 9 and gate):
+                    turns[3] = True
+                if level[(center_y - num3) // num1][center_x // num2] < 3 \
+                        or (level[(center_y - num3) // num1][center_x // num2] == 9 and gate):
+                    turns[2] = True
+            if 12 <= center_y % num1 <= 18:
+                if level[center_y // num1][(center_x - num2) // num2] < 3 \
+                        or (level[center_y // num1][(center_x - num2) // num2] == 9 and gate):
+                    turns[1] = True
+                if level[center_y // num1][(center_x + num2) // num2] < 3 \
+                        or (level[center_y // num1][(center_x + num2) // num2] == 9 and gate):
+                    turns[0] = True
+
+        if direction == 0 or direction == 1:
+            if 12 <= center_x % num2 <= 18:
+                if level[(center_y + num3) // num1][center_x // num2] < 3 \
+                        or (level[(center_y + num3) // num1][center_x // num2] == 9 and gate):
+                    turns[3] = True
+                if level[(center_y - num3) // num1][center_x // num2] < 3 \
+                        or (level[(center_y - num3) // num1][center_x // num2] == 9 and gate):
+                    turns[2] = True
+            if 12 <= center_y % num1 <= 18:
+                if level[center_y // num1][(center_x - num3) // num2] < 3 \
+                        or (level[center_y // num1][(center_x - num3) // num2] == 9 and gate):
+                    turns[1] = True
+                if level[center_y // num1][(center_x + num3) // num2] < 3 \
+                        or (level[center_y // num1][(center_x + num3) // num2] == 9 and gate):
+                    turns[0] = True
+    else:
+        turns[0] = True
+        turns[1] = True
+
+    return turns
+
+
+class Ghost:
+    # A Simulation cria os quatro fantasmas uma vez só e chama update() a cada frame;
+    # o desenho fica todo no renderer (pacman.draw_ghosts).
+    __slots__ = ('x_pos', 'y_pos', 'center_x', 'center_y', 'target', 'speed', 'direction', 'dead',
+                 'in_box', 'id', 'table', 'turns', 'rect')
+
+    def __init__(self, x_coord, y_coord, target, speed, direct, dead, box, id, table):
+        self.id = id
+        self.table = table
+        self.update(x_coord, y_coord, target, speed, direct, dead, box)
+
+    def update(self, x_coord, y_coord, target, speed, direct, dead, box):
+        self.x_pos = x_coord
+        self.y_pos = y_coord
+        self.center_x = self.x_pos + 22
+        self.center_y = self.y_pos + 22
+        self.target = target
+        self.speed = speed
+        self.direction = direct
+        self.dead = dead
+        self.in_box = box
+        self.turns, self.in_box = self.check_collisions()
+        self.rect = (self.center_x - 18, self.center_y - 18, 36, 36)
+
+    def check_collisions(self):
+    # R, L, U, D
+        self.turns = self.table.ghost_turns(self.center_x, self.center_y, self.direction,
+                                            self.in_box or self.dead)
+        if 350 < self.x_pos < 550 and 370 < self.y_pos < 480:
+            self.in_box = True
+        else:
+            self.in_box = False
+        return self.turns, self.in_box
+
+    def move_clyde(self):
+    # r, l, u, d
+        if self.direction == 0:
+            if self.target[0] > self.x_pos and self.turns[0]:
+                self.x_pos += self.speed
+            elif not self.turns[0]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+            elif self.turns[0]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                if self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                else:
+                    self.x_pos += self.speed
+        elif self.direction == 1:
+            if self.target[1] > self.y_pos and self.turns[3]:
+                self.direction = 3
+            elif self.target[0] < self.x_pos and self.turns[1]:
+                self.x_pos -= self.speed
+            elif not self.turns[1]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[1]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                if self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                else:
+                    self.x_pos -= self.speed
+        elif self.direction == 2:
+            if self.target[0] < self.x_pos and self.turns[1]:
+                self.direction = 1
+                self.x_pos -= self.speed
+            elif self.target[1] < self.y_pos and self.turns[2]:
+                self.direction = 2
+                self.y_pos -= self.speed
+            elif not self.turns[2]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[2]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                else:
+                    self.y_pos -= self.speed
+        elif self.direction == 3:
+            if self.target[1] > self.y_pos and self.turns[3]:
+                self.y_pos += self.speed
+            elif not self.turns[3]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[3]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                else:
+                    self.y_pos += self.speed
+        if self.x_pos < -30:
+            self.x_pos = 900
+        elif self.x_pos > 900:
+            self.x_pos = -30
+        return self.x_pos, self.y_pos, self.direction
+
+    def move_blinky(self):
+        # r, l, u, d
+        # blinky is going to turn whenever colliding with walls, otherwise continue straight
+        if self.direction == 0:
+            if self.target[0] > self.x_pos and self.turns[0]:
+                self.x_pos += self.speed
+            elif not self.turns[0]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+            elif self.turns[0]:
+                self.x_pos += self.speed
+        elif self.direction == 1:
+            if self.target[0] < self.x_pos and self.turns[1]:
+                self.x_pos -= self.speed
+            elif not self.turns[1]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[1]:
+                self.x_pos -= self.speed
+        elif self.direction == 2:
+            if self.target[1] < self.y_pos and self.turns[2]:
+                self.direction = 2
+                self.y_pos -= self.speed
+            elif not self.turns[2]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+            elif self.turns[2]:
+                self.y_pos -= self.speed
+        elif self.direction == 3:
+            if self.target[1] > self.y_pos and self.turns[3]:
+                self.y_pos += self.speed
+            elif not self.turns[3]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+            elif self.turns[3]:
+                self.y_pos += self.speed
+        if self.x_pos < -30:
+            self.x_pos = 900
+        elif self.x_pos > 900:
+            self.x_pos = -30
+        return self.x_pos, self.y_pos, self.direction
+
+    def move_inky(self):
+    # r, l, u, d
+        if self.direction == 0:
+            if self.target[0] > self.x_pos and self.turns[0]:
+                self.x_pos += self.speed
+            elif not self.turns[0]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+            elif self.turns[0]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                if self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                else:
+                    self.x_pos += self.speed
+        elif self.direction == 1:
+            if self.target[1] > self.y_pos and self.turns[3]:
+                self.direction = 3
+            elif self.target[0] < self.x_pos and self.turns[1]:
+                self.x_pos -= self.speed
+            elif not self.turns[1]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[1]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                if self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                else:
+                    self.x_pos -= self.speed
+        elif self.direction == 2:
+            if self.target[1] < self.y_pos and self.turns[2]:
+                self.direction = 2
+                self.y_pos -= self.speed
+            elif not self.turns[2]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[2]:
+                self.y_pos -= self.speed
+        elif self.direction == 3:
+            if self.target[1] > self.y_pos and self.turns[3]:
+                self.y_pos += self.speed
+            elif not self.turns[3]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[3]:
+                self.y_pos += self.speed
+        if self.x_pos < -30:
+            self.x_pos = 900
+        elif self.x_pos > 900:
+            self.x_pos = -30
+        return self.x_pos, self.y_pos, self.direction
+
+    def move_pinky(self):
+        # r, l, u, d
+        # inky is going to turn left or right whenever advantageous, but only up or down on collision
+        if self.direction == 0:
+            if self.target[0] > self.x_pos and self.turns[0]:
+                self.x_pos += self.speed
+            elif not self.turns[0]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+            elif self.turns[0]:
+                self.x_pos += self.speed
+        elif self.direction == 1:
+            if self.target[1] > self.y_pos and self.turns[3]:
+                self.direction = 3
+            elif self.target[0] < self.x_pos and self.turns[1]:
+                self.x_pos -= self.speed
+            elif not self.turns[1]:
+                if self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[1]:
+                self.x_pos -= self.speed
+        elif self.direction == 2:
+            if self.target[0] < self.x_pos and self.turns[1]:
+                self.direction = 1
+                self.x_pos -= self.speed
+            elif self.target[1] < self.y_pos and self.turns[2]:
+                self.direction = 2
+                self.y_pos -= self.speed
+            elif not self.turns[2]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.target[1] > self.y_pos and self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[3]:
+                    self.direction = 3
+                    self.y_pos += self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[2]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                else:
+                    self.y_pos -= self.speed
+        elif self.direction == 3:
+            if self.target[1] > self.y_pos and self.turns[3]:
+                self.y_pos += self.speed
+            elif not self.turns[3]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.target[1] < self.y_pos and self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[2]:
+                    self.direction = 2
+                    self.y_pos -= self.speed
+                elif self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                elif self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+            elif self.turns[3]:
+                if self.target[0] > self.x_pos and self.turns[0]:
+                    self.direction = 0
+                    self.x_pos += self.speed
+                elif self.target[0] < self.x_pos and self.turns[1]:
+                    self.direction = 1
+                    self.x_pos -= self.speed
+                else:
+                    self.y_pos += self.speed
+        if self.x_pos < -30:
+            self.x_pos = 900
+        elif self.x_pos > 900:
+            self.x_pos = -30
+        return self.x_pos, self.y_pos, self.direction
+
+
+def check_position(level, centerx, centery, direction):
+    turns = [False, False, False, False]
+    num1 = (HEIGHT - 50) // 32
+    num2 = (WIDTH // 30)
+    num3 = 15
+    # check collisions based on center x and center y of player +/- fudge number
+    if centerx // 30 < 29:
+        if direction == 0:
+            if level[centery // num1][(centerx - num3) // num2] < 3:
+                turns[1] = True
+        if direction == 1:
+            if level[centery // num1][(centerx + num3) // num2] < 3:
+                turns[0] = True
+        if direction == 2:
+            if level[(centery + num3) // num1][centerx // num2] < 3:
+                turns[3] = True
+        if direction == 3:
+            if level[(centery - num3) // num1][centerx // num2] < 3:
+                turns[2] = True
+
+        if direction == 2 or direction == 3:
+            if 12 <= centerx % num2 <= 18:
+                if level[(centery + num3) // num1][centerx // num2] < 3:
+                    turns[3] = True
+                if level[(centery - num3) // num1][centerx // num2] < 3:
+                    turns[2] = True
+            if 12 <= centery % num1 <= 18:
+                if level[centery // num1][(centerx - num2) // num2] < 3:
+                    turns[1] = True
+                if level[centery // num1][(centerx + num2) // num2] < 3:
+                    turns[0] = True
+        if direction == 0 or direction == 1:
+            if 12 <= centerx % num2 <= 18:
+                if level[(centery + num1) // num1][centerx // num2] < 3:
+                    turns[3] = True
+                if level[(centery - num1) // num1][centerx // num2] < 3:
+                    turns[2] = True
+            if 12 <= centery % num1 <= 18:
+                if level[centery // num1][(centerx - num3) // num2] < 3:
+                    turns[1] = True
+                if level[centery // num1][(centerx + num3) // num2] < 3:
+                    turns[0] = True
+    else:
+        turns[0] = True
+        turns[1] = True
+
+    return turns
+
+
+def move_player(play_x, play_y, direction, turns_allowed, player_speed=2):
+    # r, l, u, d
+    if direction == 0 and turns_allowed[0]:
+        play_x += player_speed
+    elif direction == 1 and turns_allowed[1]:
+        play_x -= player_speed
+    if direction == 2 and turns_allowed[2]:
+        play_y -= player_speed
+    elif direction == 3 and turns_allowed[3]:
+        play_y += player_speed
+    return play_x, play_y
+
+
+# Dentro de um tile, as probes de check_position e probe_ghost_turns só mudam de
+# resultado nestes deslocamentos (centro % 30 e centro % 28): é onde mudam
+# (c +- 15) // tamanho e a janela 12..18 de alinhamento.
+_X_CUTS = (0, 12, 15, 19)
+_Y_CUTS = (0, 12, 13, 15, 19)
+# centros de pacman e fantasmas ficam nesta faixa, túnel incluído
+_X_MIN, _X_MAX = -30, 930
+_UNKNOWN = 0xFF
+# slots por sub-tile: 0-3 pacman por direção, 4-7 fantasma (horizontal/vertical x portão)
+_SLOTS = 8
+_GHOST_SLOT = (4, 4, 6, 6)
+TURNS = [tuple(bool(mask >> k & 1) for k in range(4)) for mask in range(16)]
+
+
+def _turns_mask(turns):
+    return turns[0] | turns[1] << 1 | turns[2] << 2 | turns[3] << 3
+
+
+class MoveTable:
+    """
+    Turns permitidos (R, L, U, D) pré-calculados para um tabuleiro, indexados por
+    (sub-tile do centro, direção, portão liberado). Os valores são gerados pelas
+    próprias check_position e probe_ghost_turns, então o resultado é idêntico;
+    posições fora da faixa tabelada caem de volta nelas.
+    """
+
+    def __init__(self, board):
+        num1, num2 = _tile_sizes()
+        # pellets não mudam nada (< 3 com ou sem eles), só as paredes e o portão
+        board = board if isinstance(board, Board) else Board(board)
+        self.walls = Board([[0 if tile in (1, 2) else tile for tile in row] for row in board])
+        col_min = _X_MIN // num2
+        cols = (_X_MAX - _X_MIN) // num2
+        row_stride = cols * len(_X_CUTS) * _SLOTS
+        self.xkey = [((cx // num2 - col_min) * len(_X_CUTS) + bisect_right(_X_CUTS, cx % num2) - 1) * _SLOTS
+                     for cx in range(_X_MIN, _X_MAX)]
+        self.ykey = [(cy // num1 * len(_Y_CUTS) + bisect_right(_Y_CUTS, cy % num1) - 1) * row_stride
+                     for cy in range(len(self.walls) * num1)]
+        table = bytearray([_UNKNOWN]) * (len(self.walls) * len(_Y_CUTS) * row_stride)
+        for row in range(len(self.walls)):
+            for y_cut in _Y_CUTS:
+                cy = row * num1 + y_cut
+                for col in range(col_min, col_min + cols):
+                    for x_cut in _X_CUTS:
+                        cx = col * num2 + x_cut
+                        base = self.ykey[cy] + self.xkey[cx - _X_MIN]
+                        for d in range(4):
+                            table[base + d] = self._probe(check_position, cx, cy, d)
+                        for d in (0, 2):
+                            table[base + _GHOST_SLOT[d]] = self._probe(probe_ghost_turns, cx, cy, d, False)
+                            table[base + _GHOST_SLOT[d] + 1] = self._probe(probe_ghost_turns, cx, cy, d, True)
+        self.table = bytes(table)
+
+    def _probe(self, func, *args):
+        try:
+            return _turns_mask(func(self.walls, *args))
+        except IndexError:
+            return _UNKNOWN
+
+    def player_turns(self, centerx, centery, direction):
+        i = centerx - _X_MIN
+        if 0 <= i < _X_MAX - _X_MIN and 0 <= centery < len(self.ykey):
+            mask = self.table[self.ykey[centery] + self.xkey[i] + direction]
+            if mask != _UNKNOWN:
+                return TURNS[mask]
+        return tuple(check_position(self.walls, centerx, centery, direction))
+
+    def ghost_turns(self, center_x, center_y, direction, gate):
+        i = center_x - _X_MIN
+        if 0 <= i < _X_MAX - _X_MIN and 0 <= center_y < len(self.ykey):
+            mask = self.table[self.ykey[center_y] + self.xkey[i] + _GHOST_SLOT[direction] + (1 if gate else 0)]
+            if mask != _UNKNOWN:
+                return TURNS[mask]
+        return tuple(probe_ghost_turns(self.walls, center_x, center_y, direction, gate))
+
+
+# uma tabela por layout de paredes; só é reconstruída quando o tabuleiro muda
+_move_tables = {}
+
+
+def move_table_for(board):
+    board = board if isinstance(board, Board) else Board(board)
+    key = board.wall_key()
+    table = _move_tables.get(key)
+    if table is None:
+        table = _move_tables[key] = MoveTable(board)
+    return table
+
+
+# Campos escalares do snapshot, na ordem do struct. current_mode sai de mode_index,
+# os *_box nunca mudam e os Ghost são refeitos por update() no começo de cada step.
+_SNAPSHOT_FIELDS = (
+    'frame', 'score', 'ghosts_eaten', 'mode_timer_frames',
+    'player_x', 'player_y', 'blinky_x', 'blinky_y', 'inky_x', 'inky_y',
+    'pinky_x', 'pinky_y', 'clyde_x', 'clyde_y',
+    'power_counter', 'pellets_eaten', 'pellets_left',
+    'lives', 'counter', 'startup_counter', 'mode_index', 'direction', 'direction_command',
+    'blinky_direction', 'inky_direction', 'pinky_direction', 'clyde_direction',
+    'flicker', 'moving', 'powerup', 'game_over', 'game_won',
+    'inky_released', 'clyde_released', 'blinky_elroy',
+    'blinky_dead', 'inky_dead', 'pinky_dead', 'clyde_dead',
+)
+# + eaten_ghost (4), turns_allowed (4), ghost_speeds (4) e targets (4 x (x, y))
+_SNAPSHOT = struct.Struct('<IIII10h3Hb9B12?4?4?4B8i')
+_snapshot_values = attrgetter(*_SNAPSHOT_FIELDS)
+# tabuleiro: um bit por tile, 1 onde o tile ainda é igual ao molde (só pellets viram 0)
+_NONZERO_TO_ASCII = bytes([0x30] + [0x31] * 255)
+_ASCII_TO_MASK = bytes(0xFF if i == 0x31 else 0 for i in range(256))
+# até quantos tiles diferentes o restore acerta um a um em vez de refazer o tabuleiro todo
+_RESTORE_PATCH_LIMIT = 16
+
+# limite de um episódio headless (runner, env): 10 minutos de jogo a 60 fps
+MAX_FRAMES = 10 * 60 * FPS
+
+
+class Simulation:
+    """
+    Estado completo de uma partida. step(action) avança exatamente um frame do
+    loop original; action é a nova direction_command (0:R, 1:L, 2:U, 3:D) ou
+    None para manter a atual.
+    """
+
+    def __init__(self, board=None):
+        self.board = boards if board is None else board
+        self.table = move_table_for(self.board)
+        self.player_speed = 2
+        self.frame = 0
+        self.counter = 0
+        self.flicker = False
+        self.moving = False
+        self.turns_allowed = [False, False, False, False]
+        self.ghost_speeds = [2, 2, 2, 2]
+        # box nunca é atualizado pelo loop; fica aqui só para alimentar o Ghost
+        self.blinky_box = False
+        self.inky_box = False
+        self.pinky_box = False
+        self.clyde_box = False
+        # tabuleiro da partida; reset() só copia o molde imutável por cima
+        self.level = Board(self.board)
+        # lap(fase) do profiler.FrameProfiler, chamado ao fim de cada fase de step()
+        self.lap = None
+        # pellet_bits: bit (tiles - 1 - i) ligado enquanto o tile i for igual ao molde;
+        # check_collisions desliga o bit junto com o tile, o snapshot só copia o inteiro
+        tiles = len(self.level.cells)
+        self._last_bit = tiles - 1
+        self._board_bytes = (tiles + 7) // 8
+        self._board_format = f'0{tiles}b'
+        self._template_int = int.from_bytes(self.level.template, 'big')
+        self._template_bits = int(self.level.template.translate(_NONZERO_TO_ASCII), 2)
+        self.reset()
+        self.targets = [(self.player_x, self.player_y)] * 4
+        # blinky, inky, pinky, clyde: vivem a partida toda, step() só os atualiza
+        self.ghosts = [Ghost(x, y, self.targets[i], 2, d, False, False, i, self.table)
+                       for i, (x, y, d) in enumerate(GHOST_STARTS)]
+
+    def reset(self):
+        # reinício completo (ESPAÇO na tela de game over/vitória)
+        self.reset_positions()
+        self.score = 0
+        self.lives = 3
+        self.level.reset()
+        self.pellet_bits = self._template_bits
+        self.pellets_left = self.level.pellet_total
+        self.game_over = False
+        self.game_won = False
+        self.pellets_eaten = 0
+        self.ghosts_eaten = 0
+        # tiles (linha, coluna) zerados por check_collisions desde o último reset
+        self.cleared_tiles = []
+        self.inky_released = False
+        self.clyde_released = False
+        self.blinky_elroy = False
+        self.current_mode = 'scatter'
+        self.mode_index = 0
+        self.mode_timer_frames = 0
+
+    def reset_positions(self):
+        # volta pacman e fantasmas para o início (perda de vida)
+        self.startup_counter = 0
+        self.powerup = False
+        self.power_counter = 0
+        self.player_x, self.player_y = PLAYER_START
+        self.direction = 0
+        self.direction_command = 0
+        self.blinky_x, self.blinky_y, self.blinky_direction = GHOST_STARTS[0]
+        self.inky_x, self.inky_y, self.inky_direction = GHOST_STARTS[1]
+        self.pinky_x, self.pinky_y, self.pinky_direction = GHOST_STARTS[2]
+        self.clyde_x, self.clyde_y, self.clyde_direction = GHOST_STARTS[3]
+        self.eaten_ghost = [False, False, False, False]
+        self.blinky_dead = False
+        self.inky_dead = False
+        self.clyde_dead = False
+        self.pinky_dead = False
+
+    def snapshot(self):
+        """
+        Estado completo da partida num blob de tamanho fixo (cerca de 230 bytes no
+        tabuleiro padrão); restore() volta exatamente para ele.
+        """
+        t = self.targets
+        return _SNAPSHOT.pack(*_snapshot_values(self), *self.eaten_ghost, *self.turns_allowed,
+                              *self.ghost_speeds, *t[0], *t[1], *t[2], *t[3]) + \
+            self.pellet_bits.to_bytes(self._board_bytes, 'big')
+
+    def restore(self, blob):
+        # mesma ordem de _SNAPSHOT_FIELDS; atribuição direta é bem mais rápida que setattr
+        (self.frame, self.score, self.ghosts_eaten, self.mode_timer_frames,
+         self.player_x, self.player_y, self.blinky_x, self.blinky_y, self.inky_x, self.inky_y,
+         self.pinky_x, self.pinky_y, self.clyde_x, self.clyde_y,
+         self.power_counter, self.pellets_eaten, self.pellets_left,
+         self.lives, self.counter, self.startup_counter, self.mode_index, self.direction, self.direction_command,
+         self.blinky_direction, self.inky_direction, self.pinky_direction, self.clyde_direction,
+         self.flicker, self.moving, self.powerup, self.game_over, self.game_won,
+         self.inky_released, self.clyde_released, self.blinky_elroy,
+         self.blinky_dead, self.inky_dead, self.pinky_dead, self.clyde_dead,
+         e0, e1, e2, e3, r, l, u, d, s0, s1, s2, s3,
+         bx, by, ix, iy, px, py, cx, cy) = _SNAPSHOT.unpack_from(blob)
+        self.current_mode = mode_schedule[self.mode_index][0]
+        self.eaten_ghost = [e0, e1, e2, e3]
+        self.turns_allowed = (r, l, u, d)
+        self.ghost_speeds = [s0, s1, s2, s3]
+        self.targets = [(bx, by), (ix, iy), (px, py), (cx, cy)]
+        bits = int.from_bytes(blob[_SNAPSHOT.size:], 'big')
+        diff = self.pellet_bits ^ bits
+        if diff:
+            cells = self.level.cells
+            if diff.bit_count() <= _RESTORE_PATCH_LIMIT:
+                # estados próximos (busca, rewind) diferem em poucos pellets
+                template = self.level.template
+                while diff:
+                    low = diff & -diff
+                    i = self._last_bit - (low.bit_length() - 1)
+                    cells[i] = template[i] if bits & low else 0
+                    diff ^= low
+            else:
+                mask = format(bits, self._board_format).encode().translate(_ASCII_TO_MASK)
+                cells[:] = (self._template_int & int.from_bytes(mask, 'big')).to_bytes(len(cells), 'big')
+            self.pellet_bits = bits
+            # o tabuleiro mudou por fora de check_collisions: quem desenha precisa refazer as camadas
+            self.cleared_tiles = []
+
+    @property
+    def done(self):
+        return self.game_over or self.game_won
+
+    def check_position(self, centerx, centery):
+        return self.table.player_turns(centerx, centery, self.direction)
+
+    def move_player(self, play_x, play_y):
+        return move_player(play_x, play_y, self.direction, self.turns_allowed, self.player_speed)
+
+    def check_collisions(self, center_x, center_y):
+        num1 = (HEIGHT - 50) // 32
+        num2 = WIDTH // 30
+        cells = self.level.cells
+        if 0 < self.player_x < 870:
+            row, col = center_y // num1, center_x // num2
+            i = self.level.index(row, col)
+            if cells[i] == 1:
+                cells[i] = 0
+                self.pellet_bits ^= 1 << (self._last_bit - i)
+                self.cleared_tiles.append((row, col))
+                self.score += 10
+                self.pellets_eaten += 1
+                self.pellets_left -= 1
+            if cells[i] == 2:
+                cells[i] = 0
+                self.pellet_bits ^= 1 << (self._last_bit - i)
+                self.cleared_tiles.append((row, col))
+                self.score += 50
+                self.powerup = True
+                self.power_counter = 0
+                self.eaten_ghost = [False, False, False, False]
+                self.pellets_eaten += 1
+                self.pellets_left -= 1
+
+    def get_targets(self, blink_x, blink_y, ink_x, ink_y, pink_x, pink_y, clyd_x, clyd_y):
+        player_x, player_y = self.player_x, self.player_y
+        direction = self.direction
+        eaten_ghost = self.eaten_ghost
+        blinky, inky, pinky, clyde = self.ghosts
+        if player_x < 450:
+            runaway_x = 900
+        else:
+            runaway_x = 0
+        if player_y < 450:
+            runaway_y = 900
+        else:
+            runaway_y = 0
+        return_target = (380, 400)
+
+        # tamanhos de tile
+        num1, num2 = _tile_sizes()
+        # 2 tiles à frente (Pinky)
+        if direction == 0:
+            pink_ahead = (player_x + 4 * num2, player_y)
+        elif direction == 1:
+            pink_ahead = (player_x - 4 * num2, player_y)
+        elif direction == 2:
+            pink_ahead = (player_x, player_y - 4 * num1)
+        else:
+            pink_ahead = (player_x, player_y + 4 * num1)
+
+        # 2 tiles à frente (Inky)
+        if direction == 0:
+            two_ahead = (player_x + 2 * num2, player_y)
+        elif direction == 1:
+            two_ahead = (player_x - 2 * num2, player_y)
+        elif direction == 2:
+            two_ahead = (player_x, player_y - 2 * num1)
+        else:
+            two_ahead = (player_x, player_y + 2 * num1)
+
+        # alvo de Inky a partir do vetor
+        vx = two_ahead[0] - blink_x
+        vy = two_ahead[1] - blink_y
+        ink_vector_target = (blink_x + 2 * vx, blink_y + 2 * vy)
+
+        # distância de Clyde em tiles
+        clyde_center = (clyd_x + 22, clyd_y + 22)
+        pac_center = (player_x + 23, player_y + 24)
+        dx_tiles = abs(pac_center[0] - clyde_center[0]) / float(num2)
+        dy_tiles = abs(pac_center[1] - clyde_center[1]) / float(num1)
+        clyde_dist_tiles = math.sqrt(dx_tiles * dx_tiles + dy_tiles * dy_tiles)
+        clyde_scatter_corner = _tile_center(1, 31)
+        corner_top_left = _tile_center(1, 1)
+        corner_top_right = _tile_center(28, 1)
+        corner_bottom_right = _tile_center(28, 31)
+        if self.powerup:
+            if not blinky.dead and not eaten_ghost[0]:
+                blink_target = (runaway_x, runaway_y)
+            elif not blinky.dead and eaten_ghost[0]:
+                if 340 < blink_x < 560 and 340 < blink_y < 500:
+                    blink_target = (400, 100)
+                else:
+                    blink_target = (player_x, player_y)
+            else:
+                blink_target = return_target
+            if not inky.dead and not eaten_ghost[1]:
+                ink_target = (runaway_x, player_y)
+            elif not inky.dead and eaten_ghost[1]:
+                if 340 < ink_x < 560 and 340 < ink_y < 500:
+                    ink_target = (400, 100)
+                else:
+                    ink_target = (player_x, player_y)
+            else:
+                ink_target = return_target
+            if not pinky.dead and not eaten_ghost[2]:
+                pink_target = (player_x, runaway_y)
+            elif not pinky.dead and eaten_ghost[2]:
+                if 340 < pink_x < 560 and 340 < pink_y < 500:
+                    pink_target = (400, 100)
+                else:
+                    pink_target = (player_x, player_y)
+            else:
+                pink_target = return_target
+            if not clyde.dead and not eaten_ghost[3]:
+                clyd_target = (450, 450)
+            elif not clyde.dead and eaten_ghost[3]:
+                if 340 < clyd_x < 560 and 340 < clyd_y < 500:
+                    clyd_target = (400, 100)
+                else:
+                    clyd_target = (player_x, player_y)
+            else:
+                clyd_target = return_target
+        else:
+            current_mode = self.current_mode
+            # Scatter/Chase com exceção de Elroy
+            if not blinky.dead:
+                blink_target = (player_x, player_y) if (current_mode == 'chase' or self.blinky_elroy) else (corner_top_right)
+            else:
+                blink_target = return_target
+
+            if not inky.dead:
+                ink_target = (ink_vector_target if current_mode == 'chase' else corner_bottom_right)
+            else:
+                ink_target = return_target
+
+            if not pinky.dead:
+                pink_target = (pink_ahead if current_mode == 'chase' else corner_top_left)
+            else:
+                pink_target = return_target
+
+            if not clyde.dead:
+                clyd_target = (clyde_scatter_corner if clyde_dist_tiles <= CLYDE_SCATTER_RADIUS_TILES else (player_x, player_y)) if current_mode == 'chase' else clyde_scatter_corner
+            else:
+                clyd_target = return_target
+        return [blink_target, ink_target, pink_target, clyd_target]
+
+    def step(self, action=None):
+        # PAUSA TOTAL se game_over ou game_won
+        if self.game_over or self.game_won:
+            return
+        lap = self.lap
+        self.frame += 1
+        if self.counter < 19:
+            self.counter += 1
+            if self.counter > 3:
+                self.flicker = False
+        else:
+            self.counter = 0
+            self.flicker = True
+        if self.powerup and self.power_counter < 600:
+            self.power_counter += 1
+        elif self.powerup and self.power_counter >= 600:
+            self.power_counter = 0
+            self.powerup = False
+            self.eaten_ghost = [False, False, False, False]
+        if self.startup_counter < 60:
+            self.moving = False
+            self.startup_counter += 1
+        else:
+            self.moving = True
+
+        # scheduler de modos
+        if not self.powerup:
+            self.mode_timer_frames += 1
+            _, secs = mode_schedule[self.mode_index]
+            if self.mode_timer_frames >= secs * FPS:
+                # troca
+                self.mode_timer_frames = 0
+                self.mode_index = (self.mode_index + 1) % len(mode_schedule)
+                self.current_mode = mode_schedule[self.mode_index][0]
+                # reverter direções
+                self.blinky_direction = _reverse_dir(self.blinky_direction)
+                self.pinky_direction = _reverse_dir(self.pinky_direction)
+                self.inky_direction = _reverse_dir(self.inky_direction)
+                self.clyde_direction = _reverse_dir(self.clyde_direction)
+
+        # Elroy
+        if not self.blinky_elroy and self.pellets_eaten >= ELROY_PELLETS:
+            self.blinky_elroy = True
+        center_x = self.player_x + 23
+        center_y = self.player_y + 24
+        if self.powerup:
+            ghost_speeds = [1, 1, 1, 1]
+        else:
+            ghost_speeds = [2, 2, 2, 2]
+        # Elroy: blinky ligeiramente mais rápido
+        if self.blinky_elroy and not self.powerup and not self.blinky_dead:
+            ghost_speeds[0] = 3
+        for i in range(4):
+            if self.eaten_ghost[i]:
+                ghost_speeds[i] = 2
+        if self.blinky_dead:
+            ghost_speeds[0] = 4
+        if self.inky_dead:
+            ghost_speeds[1] = 4
+        if self.pinky_dead:
+            ghost_speeds[2] = 4
+        if self.clyde_dead:
+            ghost_speeds[3] = 4
+        self.ghost_speeds = ghost_speeds
+        if lap is not None:
+            lap('mode_scheduler')
+
+        # check_collisions mantém pellets_left em dia, não precisa varrer o tabuleiro
+        self.game_won = self.pellets_left == 0
+
+        player_circle = _player_rect(center_x, center_y)
+        targets = self.targets
+        blinky, inky, pinky, clyde = self.ghosts
+        blinky.update(self.blinky_x, self.blinky_y, targets[0], ghost_speeds[0], self.blinky_direction,
+                      self.blinky_dead, self.blinky_box)
+        inky.update(self.inky_x, self.inky_y, targets[1], ghost_speeds[1], self.inky_direction,
+                    self.inky_dead, self.inky_box)
+        pinky.update(self.pinky_x, self.pinky_y, targets[2], ghost_speeds[2], self.pinky_direction,
+                     self.pinky_dead, self.pinky_box)
+        clyde.update(self.clyde_x, self.clyde_y, targets[3], ghost_speeds[3], self.clyde_direction,
+                     self.clyde_dead, self.clyde_box)
+        if lap is not None:
+            lap('ghost_update')
+        targets = self.get_targets(self.blinky_x, self.blinky_y, self.inky_x, self.inky_y,
+                                   self.pinky_x, self.pinky_y, self.clyde_x, self.clyde_y)
+        # alvo de saída quando na box (tile 9)
+        gate_target = (400, 100)
+        if blinky.in_box and not self.blinky_dead:
+            targets[0] = gate_target
+        if pinky.in_box and not self.pinky_dead:
+            targets[2] = gate_target
+        # Inky: só libera após INKY_RELEASE_PELLETS
+        if self.pellets_eaten >= INKY_RELEASE_PELLETS:
+            self.inky_released = True
+        if inky.in_box and not self.inky_dead:
+            targets[1] = gate_target if self.inky_released else (self.inky_x, self.inky_y)
+        # Clyde: só libera após CLYDE_RELEASE_PELLETS
+        if self.pellets_eaten >= CLYDE_RELEASE_PELLETS:
+            self.clyde_released = True
+        if clyde.in_box and not self.clyde_dead:
+            targets[3] = gate_target if self.clyde_released else (self.clyde_x, self.clyde_y)
+        self.targets = targets
+        if lap is not None:
+            lap('get_targets')
+
+        self.turns_allowed = self.check_position(center_x, center_y)
+        if lap is not None:
+            lap('check_position')
+        if self.moving:
+            self.player_x, self.player_y = self.move_player(self.player_x, self.player_y)
+            if not self.blinky_dead and not blinky.in_box:
+                self.blinky_x, self.blinky_y, self.blinky_direction = blinky.move_blinky()
+            else:
+                self.blinky_x, self.blinky_y, self.blinky_direction = blinky.move_clyde()
+            if not self.pinky_dead and not pinky.in_box:
+                self.pinky_x, self.pinky_y, self.pinky_direction = pinky.move_pinky()
+            else:
+                self.pinky_x, self.pinky_y, self.pinky_direction = pinky.move_clyde()
+            # Inky: se morto (olhos), sempre se move para retornar ao covil; se vivo e não liberado, fica parado
+            if self.inky_dead:
+                self.inky_x, self.inky_y, self.inky_direction = inky.move_clyde()
+            elif self.inky_released:
+                self.inky_x, self.inky_y, self.inky_direction = inky.move_inky()
+            # Clyde: idem, mas usa o próprio movimento quando liberado
+            if self.clyde_dead or self.clyde_released:
+                self.clyde_x, self.clyde_y, self.clyde_direction = clyde.move_clyde()
+        if lap is not None:
+            lap('movement')
+        self.check_collisions(center_x, center_y)
+        if lap is not None:
+            lap('check_collisions')
+        # add to if not powerup to check if eaten ghosts
+        if not self.powerup:
+            if (_colliderect(player_circle, blinky.rect) and not blinky.dead) or \
+                    (_colliderect(player_circle, inky.rect) and not inky.dead) or \
+                    (_colliderect(player_circle, pinky.rect) and not pinky.dead) or \
+                    (_colliderect(player_circle, clyde.rect) and not clyde.dead):
+                if self.lives > 0:
+                    self.lives -= 1
+                    self.reset_positions()
+                else:
+                    self.game_over = True
+                    self.moving = False
+                    self.startup_counter = 0
+                    # resetar modos
+                    self.current_mode = 'scatter'
+                    self.mode_index = 0
+                    self.mode_timer_frames = 0
+                    self.blinky_elroy = False
+                    self.inky_released = False
+                    self.clyde_released = False
+        # Nota: durante powerup, colisões com fantasmas devem ser sempre comestíveis (ou olhos inofensivos),
+        # portanto não há penalidade de morte nesse estado.
+        eaten_ghost = self.eaten_ghost
+        if self.powerup and _colliderect(player_circle, blinky.rect) and not blinky.dead and not eaten_ghost[0]:
+            self.blinky_dead = True
+            eaten_ghost[0] = True
+            self.ghosts_eaten += 1
+            self.score += (2 ** eaten_ghost.count(True)) * 100
+        if self.powerup and _colliderect(player_circle, inky.rect) and not inky.dead and not eaten_ghost[1]:
+            self.inky_dead = True
+            eaten_ghost[1] = True
+            self.ghosts_eaten += 1
+            self.score += (2 ** eaten_ghost.count(True)) * 100
+        if self.powerup and _colliderect(player_circle, pinky.rect) and not pinky.dead and not eaten_ghost[2]:
+            self.pinky_dead = True
+            eaten_ghost[2] = True
+            self.ghosts_eaten += 1
+            self.score += (2 ** eaten_ghost.count(True)) * 100
+        if self.powerup and _colliderect(player_circle, clyde.rect) and not clyde.dead and not eaten_ghost[3]:
+            self.clyde_dead = True
+            eaten_ghost[3] = True
+            self.ghosts_eaten += 1
+            self.score += (2 ** eaten_ghost.count(True)) * 100
+
+        if action is not None:
+            self.direction_command = action
+        if self.direction_command == 0 and self.turns_allowed[0]:
+            self.direction = 0
+        if self.direction_command == 1 and self.turns_allowed[1]:
+            self.direction = 1
+        if self.direction_command == 2 and self.turns_allowed[2]:
+            self.direction = 2
+        if self.direction_command == 3 and self.turns_allowed[3]:
+            self.direction = 3
+
+        if self.player_x > 900:
+            self.player_x = -47
+        elif self.player_x < -50:
+            self.player_x = 897
+
+        if blinky.in_box and self.blinky_dead:
+            self.blinky_dead = False
+        if inky.in_box and self.inky_dead:
+            self.inky_dead = False
+        if pinky.in_box and self.pinky_dead:
+            self.pinky_dead = False
+        if clyde.in_box and self.clyde_dead:
+            self.clyde_dead = False
+        if lap is not None:
+            lap('ghost_collisions')
+
+    def advance(self, frames, action=None):
+        """
+        Avança frames frames: mesmo estado final de step(action) seguido de
+        step() frames - 1 vezes, bit a bit. Só a largada congelada (os 60
+        frames depois de reset() ou de perder uma vida) é pulada de uma vez:
+        ninguém anda, nenhum fantasma decide e nenhum pellet é comido, só os
+        timers contam (_frozen_frames). O resto roda por step(). Devolve quantos
+        frames rodaram (menos que frames se a partida acabar).
+        """
+        if frames <= 0 or self.done:
+            return 0
+        start = self.frame
+        self.step(action)
+        left = frames - 1
+        while left > 0 and not self.done:
+            frozen = self._frozen_frames(left)
+            if frozen > 1:
+                # o último frame parado roda por step(), que refaz alvos, turns e velocidades
+                self._skip_frozen(frozen - 1)
+                left -= frozen - 1
+            self.step()
+            left -= 1
+        return self.frame - start
+
+    def _frozen_frames(self, limit):
+        # quantos dos próximos frames (até limit) são da largada sem nenhum evento;
+        # 0 se não há pelo menos dois. startup_counter >= 1: o frame anterior já
+        # rodou com os atores onde estão (os rects dos Ghost estão em dia)
+        if not 1 <= self.startup_counter < 60:
+            return 0
+        limit = min(limit, 60 - self.startup_counter)
+        # power_counter vencendo ou troca de modo (que inverte as direções)
+        if self.powerup:
+            limit = min(limit, 600 - self.power_counter)
+        else:
+            limit = min(limit, mode_schedule[self.mode_index][1] * FPS - 1 - self.mode_timer_frames)
+        if limit <= 1:
+            return 0
+        # fantasma morto volta a viver na casa; encostado no pacman, morte ou fantasma comido
+        if self.blinky_dead or self.inky_dead or self.pinky_dead or self.clyde_dead:
+            return 0
+        player_circle = _player_rect(self.player_x + 23, self.player_y + 24)
+        for ghost in self.ghosts:
+            if _colliderect(player_circle, ghost.rect):
+                return 0
+        return limit
+
+    def _skip_frozen(self, frames):
+        # frames frames parados: só os contadores que step() soma
+        self.frame += frames
+        counter = (self.counter + frames) % 20
+        if counter == 0 or (counter <= 3 and frames >= counter):
+            self.flicker = True
+        elif counter > 3:
+            self.flicker = False
+        self.counter = counter
+        if self.powerup:
+            self.power_counter += frames
+        else:
+            self.mode_timer_frames += frames
+        self.startup_counter += frames
+        self.moving = False
@@ -0,0 +1,49 @@
+"""
+Estado comparado nos traços de referência: as mesmas variáveis do loop do
+pacman.py original, lidas por nome (globais do script ou atributos da
+Simulation), reduzidas a um crc32 por frame.
+"""
+import gzip
+import json
+import zlib
+import base64
+import struct
+
+FIELDS = (
+    'player_x', 'player_y', 'direction', 'direction_command',
+    'blinky_x', 'blinky_y', 'blinky_direction', 'inky_x', 'inky_y', 'inky_direction',
+    'pinky_x', 'pinky_y', 'pinky_direction', 'clyde_x', 'clyde_y', 'clyde_direction',
+    'counter', 'flicker', 'score', 'powerup', 'power_counter',
+    'blinky_dead', 'inky_dead', 'pinky_dead', 'clyde_dead', 'startup_counter', 'lives',
+    'game_over', 'game_won', 'pellets_eaten', 'inky_released', 'clyde_released',
+    'blinky_elroy', 'current_mode', 'mode_index', 'mode_timer_frames',
+)
+
+
+def state(get):
+    # get(nome) devolve a variável; listas viram tuplas para o repr ser o mesmo dos dois lados
+    return (tuple(get(name) for name in FIELDS), tuple(get('eaten_ghost')),
+            tuple(tuple(t) for t in get('targets')), tuple(get('ghost_speeds')),
+            tuple(tuple(row) for row in get('level')))
+
+
+class SimVars:
+    # as variáveis da Simulation pelo nome, como o bot do tests/record_baseline lê as globais do script
+    def __init__(self, sim):
+        self.sim = sim
+
+    def __getitem__(self, name):
+        return getattr(self.sim, name)
+
+
+def state_crc(get):
+    return zlib.crc32(repr(state(get)).encode())
+
+
+def load_trace(path):
+    """(ações por índice de passo, índices de reinício, crc32 por frame) de tests/data."""
+    with gzip.open(path, 'rt') as f:
+        data = json.load(f)
+    raw = base64.b64decode(data['crc32'])
+    crcs = struct.unpack(f'<{len(raw) // 4}I', raw)
+    return data, dict(data['actions']), set(data['restarts']), crcs
@@ -0,0 +1,141 @@
+"""
+Grava os traços de referência de tests/data a partir do pacman.py original
+(o do primeiro commit do repositório), antes da Simulation existir.
+
+O script original roda inteiro com o driver de vídeo dummy; só cinco linhas
+são trocadas: a tela de início some, o timer não espera, os eventos do teclado
+vêm da política, a tela de fim de jogo aperta espaço sozinha e o fim de cada
+frame grava um crc32 do estado. A política é aleatória (random), um bot que
+vai atrás de pellets e de fantasmas assustados (bot), para passar por power
+pellets e fantasmas comidos, ou o mesmo bot indo e voltando pelo túnel (tunnel).
+
+    python tests/record_baseline.py random 1 6000
+    python tests/record_baseline.py bot 1001 15000
+    python tests/record_baseline.py tunnel 7 6000
+"""
+import os
+import sys
+import gzip
+import json
+import base64
+import struct
+import random
+import argparse
+import subprocess
+from collections import deque
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA = os.path.join(ROOT, 'tests', 'data')
+sys.path.insert(0, ROOT)
+from tests.parity import state_crc  # noqa: E402
+
+# linha (0-based) do pacman.py original -> (texto esperado, substituto)
+_PATCHES = {
+    1309: ('show_start_screen()', 'pass'),
+    1323: ('        for event in pygame.event.get():', '        for event in _pause_events():'),
+    1367: ('    timer.tick(fps)', '    pass'),
+    1568: ('    for event in pygame.event.get():', '    for event in _events():'),
+    1658: ('    pygame.display.flip()', '    _record()\n    if len(_trace) >= _frames: run = False'),
+}
+_DIRS = ((1, 0, 0), (-1, 0, 1), (0, -1, 2), (0, 1, 3))
+_NAMES = ('blinky', 'inky', 'pinky', 'clyde')
+
+
+def original_source(rev=None):
+    if rev is None:
+        rev = subprocess.run(['git', 'rev-list', '--max-parents=0', 'HEAD'], cwd=ROOT, check=True,
+                             capture_output=True, text=True).stdout.split()[0]
+    return subprocess.run(['git', 'show', f'{rev}:pacman.py'], cwd=ROOT, check=True,
+                          capture_output=True, text=True).stdout
+
+
+def bot_action(g, rng, tunnel=False, eps=0.05):
+    # BFS até o power pellet/pellet mais perto, até um fantasma assustado ou até a boca do túnel
+    if rng.random() < eps:
+        return rng.randrange(4)
+    level = g['level']
+    start = ((g['player_x'] + 23) // 30 % 30, (g['player_y'] + 24) // 28)
+    goals = set()
+    if tunnel:
+        goals = {(c, r) for r, row in enumerate(level) for c in (0, len(row) - 1) if row[c] < 3}
+    elif g['powerup']:
+        for i, name in enumerate(_NAMES):
+            if not g[name + '_dead'] and not g['eaten_ghost'][i]:
+                goals.add(((g[name + '_x'] + 22) // 30 % 30, (g[name + '_y'] + 22) // 28))
+    if not goals:
+        want = 2 if any(2 in row for row in level) else 1
+        goals = {(c, r) for r, row in enumerate(level) for c, v in enumerate(row) if v == want}
+    seen = {start: None}
+    queue = deque([start])
+    while queue:
+        cur = queue.popleft()
+        if cur in goals and cur != start:
+            while seen[cur][0] != start:
+                cur = seen[cur][0]
+            return seen[cur][1]
+        for dx, dy, d in _DIRS:
+            nxt = ((cur[0] + dx) % 30, cur[1] + dy)
+            if 0 <= nxt[1] < 32 and level[nxt[1]][nxt[0]] < 3 and nxt not in seen:
+                seen[nxt] = (cur, d)
+                queue.append(nxt)
+    return None
+
+
+def record(policy, seed, frames, source):
+    """(ações, índices de reinício, crc32 por frame) de uma partida do script original."""
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    import pygame
+    lines = source.splitlines()
+    for index, (expected, replacement) in _PATCHES.items():
+        if lines[index] != expected:
+            raise SystemExit(f'linha {index + 1} do pacman.py original não é {expected!r}')
+        lines[index] = replacement
+    rng = random.Random(seed)
+    keys = (pygame.K_RIGHT, pygame.K_LEFT, pygame.K_UP, pygame.K_DOWN)
+    trace, actions, restarts = [], [], []
+    g = {'__name__': '__baseline__'}
+
+    def events():
+        if policy != 'random':
+            action = bot_action(g, rng, policy == 'tunnel') if len(trace) % 4 == 0 else None
+        else:
+            action = rng.randrange(4) if rng.random() < 0.06 else None
+        if action is None:
+            return []
+        actions.append((len(trace), action))
+        return [pygame.event.Event(pygame.KEYDOWN, key=keys[action])]
+
+    def pause_events():
+        restarts.append(len(trace))
+        trace.append(None)
+        return [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)]
+
+    def record_frame():
+        trace.append(state_crc(g.__getitem__))
+
+    g.update(_events=events, _pause_events=pause_events, _record=record_frame, _trace=trace, _frames=frames)
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        exec(compile('\n'.join(lines), 'pacman.py', 'exec'), g)
+    finally:
+        os.chdir(cwd)
+    return actions, restarts, [crc for crc in trace if crc is not None]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Grava um traço de referência do pacman.py original.')
+    parser.add_argument('policy', choices=('random', 'bot', 'tunnel'))
+    parser.add_argument('seed', type=int)
+    parser.add_argument('frames', type=int)
+    parser.add_argument('--rev', help='commit do pacman.py original (padrão: o primeiro do repositório)')
+    args = parser.parse_args()
+    actions, restarts, crcs = record(args.policy, args.seed, args.frames, original_source(args.rev))
+    data = {'policy': args.policy, 'seed': args.seed, 'steps': len(crcs) + len(restarts),
+            'actions': actions, 'restarts': restarts,
+            'crc32': base64.b64encode(struct.pack(f'<{len(crcs)}I', *crcs)).decode()}
+    path = os.path.join(DATA, f'baseline_{args.policy}_{args.seed}.json.gz')
+    with gzip.open(path, 'wt') as f:
+        json.dump(data, f)
+    print(f'{path}: {len(crcs)} frames, {len(restarts)} reinícios')
@@ -0,0 +1,78 @@
+"""
+BatchSimulation contra N Simulation escalares com as mesmas teclas: todos os
+campos e o tabuleiro de cada partida, frame a frame.
+"""
+import random
+import numpy as np
+from simulation import Simulation
+from batch_simulation import BatchSimulation
+from tests.parity import SimVars
+from tests.record_baseline import bot_action
+
+GHOSTS = ('blinky', 'inky', 'pinky', 'clyde')
+SCALARS = ('frame', 'player_x', 'player_y', 'direction', 'direction_command', 'counter', 'flicker', 'moving',
+           'startup_counter', 'powerup', 'power_counter', 'score', 'lives', 'game_over', 'game_won',
+           'pellets_eaten', 'pellets_left', 'inky_released', 'clyde_released', 'blinky_elroy',
+           'mode_index', 'mode_timer_frames')
+
+
+def scalar_state(s):
+    state = {name: int(getattr(s, name)) for name in SCALARS}
+    state['ghost_x'] = [getattr(s, g + '_x') for g in GHOSTS]
+    state['ghost_y'] = [getattr(s, g + '_y') for g in GHOSTS]
+    state['ghost_direction'] = [getattr(s, g + '_direction') for g in GHOSTS]
+    state['ghost_dead'] = [getattr(s, g + '_dead') for g in GHOSTS]
+    state['eaten_ghost'] = list(s.eaten_ghost)
+    state['targets'] = [list(t) for t in s.targets]
+    state['ghost_speeds'] = list(s.ghost_speeds)
+    state['turns_allowed'] = list(s.turns_allowed)
+    state['level'] = bytes(s.level.cells)
+    return state
+
+
+def batch_state(b, i):
+    state = {name: int(getattr(b, name)[i]) for name in SCALARS}
+    for name in ('ghost_x', 'ghost_y', 'ghost_direction', 'ghost_dead', 'eaten_ghost', 'targets',
+                 'ghost_speeds', 'turns_allowed'):
+        state[name] = getattr(b, name)[i].tolist()
+    state['level'] = b.level[i].tobytes()
+    return state
+
+
+def test_batch_matches_scalar():
+    # duas partidas aleatórias, duas do bot de pellets/fantasmas e duas do bot do túnel
+    policies = ('random', 'random', 'bot', 'bot', 'tunnel', 'tunnel')
+    n, frames = len(policies), 3000
+    rng = random.Random(0)
+    sims = [Simulation() for _ in range(n)]
+    batch = BatchSimulation(n)
+    seen = set()
+    for f in range(frames):
+        done = batch.done.copy()
+        for i, sim in enumerate(sims):
+            assert sim.done == done[i], f'frame {f}, partida {i}: fim de jogo diferente'
+            if sim.done:
+                sim.reset()
+        if done.any():
+            batch.reset(done)
+        actions = []
+        for sim, policy in zip(sims, policies):
+            if policy == 'random':
+                action = rng.randrange(4) if rng.random() < 0.06 else None
+            else:
+                action = bot_action(SimVars(sim), rng, policy == 'tunnel') if f % 4 == 0 else None
+            actions.append(action)
+            sim.step(action)
+        batch.step(np.array([-1 if a is None else a for a in actions]))
+        for i, sim in enumerate(sims):
+            expected, got = scalar_state(sim), batch_state(batch, i)
+            diff = {k: (expected[k], got[k]) for k in expected if expected[k] != got[k] and k != 'level'}
+            assert not diff, f'frame {f}, partida {i}: {diff}'
+            assert expected['level'] == got['level'], f'frame {f}, partida {i}: tabuleiro diferente'
+            if sim.powerup:
+                seen.add('powerup')
+            if any(expected['ghost_dead']):
+                seen.add('ghost_dead')
+            if not 0 <= sim.player_x <= 860:
+                seen.add('tunnel')
+    assert seen == {'powerup', 'ghost_dead', 'tunnel'}
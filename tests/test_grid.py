@@ -0,0 +1,63 @@
+"""
+Board contra a lista de listas que ele substituiu: leitura, escrita,
+índices negativos, iteração, erros fora da faixa e reset.
+"""
+import copy
+import random
+import pytest
+from assets.board import boards
+from grid import Board
+
+
+def test_reads_like_the_list():
+    board, ref = Board(boards), copy.deepcopy(boards)
+    assert len(board) == len(ref)
+    assert board.to_lists() == ref
+    assert [list(row) for row in board] == ref
+    for r in range(-len(ref), len(ref)):
+        assert len(board[r]) == len(ref[r])
+        for c in range(-len(ref[r]), len(ref[r])):
+            assert board[r][c] == ref[r][c]
+        assert list(board[r][2:7]) == ref[r][2:7]
+        for tile in range(10):
+            assert (tile in board[r]) == (tile in ref[r])
+
+
+def test_out_of_range_raises_like_the_list():
+    board = Board(boards)
+    rows, cols = len(boards), len(boards[0])
+    for r, c in ((rows, 0), (-rows - 1, 0), (0, cols), (0, -cols - 1)):
+        with pytest.raises(IndexError):
+            boards[r][c]
+        with pytest.raises(IndexError):
+            board[r][c]
+
+
+def test_writes_like_the_list():
+    board, ref = Board(boards), copy.deepcopy(boards)
+    rng = random.Random(0)
+    for _ in range(2000):
+        r, c, tile = rng.randrange(-len(ref), len(ref)), rng.randrange(-30, 30), rng.choice((0, 1, 2))
+        board[r][c] = tile
+        ref[r][c] = tile
+        assert board.cells[board.index(r % len(ref), c % 30)] == tile
+    assert board.to_lists() == ref
+    # o molde e as máscaras não mudam com a partida
+    assert board.template == bytes(tile for row in boards for tile in row)
+    board.reset()
+    assert board.to_lists() == boards
+
+
+def test_masks_and_copies():
+    board = Board(boards)
+    for k, tile in enumerate(board.template):
+        assert board.walls[k] == (3 <= tile <= 8)
+        assert board.walkable[k] == (tile < 3)
+        assert board.gate[k] == (tile == 9)
+        assert board.passable[k] == (tile < 3 or tile == 9)
+    assert board.pellet_total == sum(row.count(1) + row.count(2) for row in boards)
+    board[3][3] = 0
+    # Board(board) é um tabuleiro novo a partir do mesmo molde, como o deepcopy do original
+    fresh = Board(board)
+    assert fresh.to_lists() == boards
+    assert fresh.digest() == board.digest() == Board(boards).digest()
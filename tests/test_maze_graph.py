@@ -0,0 +1,121 @@
+"""
+MazeGraph contra um Dijkstra direto na grade de tiles, com e sem o portão:
+tile_distance, path e EdgeWalker andando até o fim da aresta.
+"""
+import heapq
+import pytest
+from assets.board import boards
+from maze_graph import MazeGraph, STEPS, GATE, _reverse
+from simulation import WIDTH, _tile_sizes, _tile_center
+
+GRAPH = MazeGraph.build(boards)
+ROWS, COLS = len(boards), len(boards[0])
+# tudo o que o grafo alcança, portão incluído
+TILES = [(c, r) for r in range(ROWS) for c in range(COLS) if GRAPH.locate((c, r), True) is not None]
+
+
+def moves(tile, gate):
+    # (direção, vizinho, pixels) pela grade, com a volta do túnel e o portão só na vertical
+    num1, num2 = _tile_sizes()
+    c, r = tile
+    for d, (dc, dr) in enumerate(STEPS):
+        nc, nr = (c + dc) % COLS, r + dr
+        if not 0 <= nr < ROWS:
+            continue
+        there = boards[nr][nc]
+        if not (there < 3 or (there == GATE and gate)):
+            continue
+        if dr == 0 and (boards[r][c] == GATE or there == GATE):
+            continue
+        yield d, (nc, nr), num2 if dr == 0 else num1
+
+
+def grid_distances(src, gate):
+    dist = {src: 0}
+    heap = [(0, src)]
+    while heap:
+        d, tile = heapq.heappop(heap)
+        if d > dist[tile]:
+            continue
+        for _, nxt, step in moves(tile, gate):
+            if d + step < dist.get(nxt, float('inf')):
+                dist[nxt] = d + step
+                heapq.heappush(heap, (d + step, nxt))
+    return dist
+
+
+@pytest.mark.parametrize('gate', (False, True))
+def test_tile_distance_matches_grid(gate):
+    for a in TILES:
+        if not gate and boards[a[1]][a[0]] == GATE:
+            assert all(GRAPH.tile_distance(a, b, gate) is None for b in TILES)
+            continue
+        expected = grid_distances(a, gate)
+        for b in TILES:
+            assert GRAPH.tile_distance(a, b, gate) == expected.get(b), (a, b)
+
+
+@pytest.mark.parametrize('gate', (False, True))
+def test_path_matches_grid(gate):
+    for src, tile in enumerate(GRAPH.nodes):
+        expected = grid_distances(tile, gate)
+        for dst, other in enumerate(GRAPH.nodes):
+            path = GRAPH.path(src, dst, gate)
+            if src == dst or other not in expected:
+                assert path == []
+                continue
+            node = src
+            for e in path:
+                edge = GRAPH.edges[e]
+                assert edge.src == node and (gate or edge.kind != 'gate')
+                node = edge.dst
+            assert node == dst
+            assert sum(GRAPH.edges[e].length for e in path) == expected[other]
+
+
+@pytest.mark.parametrize('gate', (False, True))
+def test_walker_follows_the_grid(gate):
+    for tile in TILES:
+        for d in range(4):
+            walker = GRAPH.walker_at(tile, d, gate)
+            # na grade: passo em d e depois a única saída que não é voltar, até um nó
+            path = [tile]
+            step = next((nxt for k, nxt, _ in moves(tile, True) if k == d), None)
+            if step is None or (not gate and tile in GRAPH.gates):
+                assert walker is None
+                continue
+            pixels = 0
+            while True:
+                pixels += next(p for k, nxt, p in moves(path[-1], True) if k == d)
+                path.append(step)
+                if step in GRAPH.node_at:
+                    break
+                d = next(k for k, _, _ in moves(step, True) if k != _reverse(d))
+                step = next(nxt for k, nxt, _ in moves(step, True) if k == d)
+            if not gate and any(t in GRAPH.gates for t in path[1:]):
+                assert walker is None
+                continue
+            assert walker is not None, (tile, d)
+            edge = GRAPH.edges[walker.edge]
+            assert edge.dst == GRAPH.node_at[path[-1]]
+            assert edge.length - walker.offset == pixels
+            # o walker passa pelo centro de cada tile da grade
+            for k, t in enumerate(path):
+                x, y = walker.position()
+                cx, cy = _tile_center(*t)
+                assert (round(x) % WIDTH, round(y)) == (cx % WIDTH, cy), (tile, k)
+                if k + 1 < len(path):
+                    arrived = walker.advance(next(p for _, nxt, p in moves(t, True) if nxt == path[k + 1]))
+            assert arrived == edge.dst
+
+
+def test_choose_exit_wraps_the_tunnel():
+    # abre um corredor em (0, 13)-(0, 14): (0, 15), na boca do túnel, vira nó
+    board = [list(row) for row in boards]
+    board[13][0] = board[14][0] = 0
+    graph = MazeGraph.build(board)
+    node = graph.node_at[(0, 15)]
+    tunnel = graph.exits[node][1]
+    assert graph.edges[tunnel].kind == 'tunnel'
+    # alvo logo do outro lado da tela: a saída pela esquerda é a mais perto
+    assert graph.choose_exit(node, _tile_center(COLS - 1, 15)) == tunnel
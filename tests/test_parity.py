@@ -0,0 +1,33 @@
+"""
+Simulation.step contra o pacman.py original: cada traço de tests/data foi
+gravado pelo script original (tests/record_baseline.py) e guarda as teclas,
+os reinícios e um crc32 do estado ao fim de cada frame.
+"""
+import glob
+import os
+import pytest
+from simulation import Simulation
+from tests.parity import load_trace, state, state_crc
+
+TRACES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'data', 'baseline_*.json.gz')))
+
+
+@pytest.mark.parametrize('path', TRACES, ids=os.path.basename)
+def test_step_matches_original(path):
+    data, actions, restarts, crcs = load_trace(path)
+    sim = Simulation()
+    get = lambda name: getattr(sim, name)
+    frame = 0
+    for k in range(data['steps']):
+        if k in restarts:
+            assert sim.done, f'passo {k}: o original reiniciou e a Simulation não terminou'
+            sim.reset()
+            continue
+        sim.step(actions.get(k))
+        assert state_crc(get) == crcs[frame], f'passo {k} (frame {frame}) diverge do original: {state(get)[0]}'
+        frame += 1
+    assert frame == len(crcs)
+
+
+def test_traces_present():
+    assert TRACES, 'tests/data sem traços de referência'
@@ -0,0 +1,73 @@
+"""
+Fontes e textos renderizados compartilhados pelo HUD e pelos overlays.
+
+Cada pygame.font.Font é criada uma vez por (arquivo, tamanho) e os textos
+renderizados ficam num cache LRU com chave (texto, tamanho, cor), então placar,
+nomes dos fantasmas e os dígitos da matriz só são rasterizados quando mudam.
+As superfícies devolvidas são compartilhadas: só servem para blit.
+"""
+from collections import OrderedDict
+import pygame
+
+FONT_FILE = 'freesansbold.ttf'
+
+# fontes já abertas, por (arquivo, tamanho)
+_fonts = {}
+
+
+def get_font(size, name=FONT_FILE):
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        try:
+            font = pygame.font.Font(name, size)
+        except FileNotFoundError:
+            # sem o arquivo, usa a fonte padrão do Pygame
+            font = pygame.font.Font(None, size)
+        _fonts[key] = font
+    return font
+
+
+class TextCache:
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+
+    def render(self, text, size, color, antialias=True):
+        key = (text, size, color, antialias)
+        surface = self._items.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._items.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = get_font(size).render(text, antialias, color)
+        self._items[key] = surface
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+        return surface
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._items),
+                'hit_rate': self.hits / total if total else 0.0}
+
+    def clear(self):
+        self._items.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+text_cache = TextCache()
+
+
+def render_text(text, size, color, antialias=True):
+    return text_cache.render(text, size, color, antialias)
+
+
+def reset():
+    # depois de pygame.quit() as fontes antigas não valem mais
+    _fonts.clear()
+    text_cache.clear()
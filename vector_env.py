@@ -0,0 +1,153 @@
+"""
+K instâncias do PacmanEnv em processos separados, trocando dados só por
+memória compartilhada.
+
+Observações, recompensas, flags de fim, ações e o comando da rodada ficam num
+único bloco multiprocessing.shared_memory; cada worker escreve direto na sua
+fatia (o PacmanEnv recebe o pedaço do bloco como array de observação). A cada
+step o processo principal escreve as ações e todos passam duas vezes por uma
+Barrier: uma para liberar os workers e outra para esperar o fim. Nada é
+serializado por step.
+
+Ambientes que terminam são reiniciados na hora (auto-reset): a observação
+devolvida já é a do começo do próximo episódio, e terminated/truncated dizem
+que o anterior acabou.
+"""
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from env import PacmanEnv, N_PLANES
+from simulation import Simulation, MAX_FRAMES
+
+# comandos da rodada
+_STEP = 0
+_RESET = 1
+_CLOSE = 2
+
+
+def _layout(num_envs, obs_shape):
+    # (nome, dtype, shape) na ordem do bloco; cada campo começa alinhado em 8 bytes
+    fields = [('obs', np.uint8, (num_envs,) + obs_shape),
+              ('rewards', np.float32, (num_envs,)),
+              ('terminated', np.bool_, (num_envs,)),
+              ('truncated', np.bool_, (num_envs,)),
+              ('actions', np.int8, (num_envs,)),
+              ('command', np.int32, (1,))]
+    offset = 0
+    layout = []
+    for name, dtype, shape in fields:
+        layout.append((name, dtype, shape, offset))
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        offset += (size + 7) // 8 * 8
+    return layout, offset
+
+
+def _views(buf, num_envs, obs_shape):
+    layout, _ = _layout(num_envs, obs_shape)
+    return {name: np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+            for name, dtype, shape, offset in layout}
+
+
+def _worker(shm_name, num_envs, obs_shape, start, stop, board, max_steps, barrier):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    v = _views(shm.buf, num_envs, obs_shape)
+    rewards, terminated, truncated, actions, command = (
+        v['rewards'], v['terminated'], v['truncated'], v['actions'], v['command'])
+    envs = []
+    try:
+        envs = [PacmanEnv(board, max_steps, obs=v['obs'][i]) for i in range(start, stop)]
+        while True:
+            barrier.wait()
+            cmd = command[0]
+            if cmd == _CLOSE:
+                break
+            for i, env in enumerate(envs, start):
+                if cmd == _RESET:
+                    env.reset()
+                    rewards[i] = 0
+                    terminated[i] = truncated[i] = False
+                    continue
+                _, reward, term, trunc, _ = env.step(actions[i])
+                rewards[i] = reward
+                terminated[i] = term
+                truncated[i] = trunc
+                if term or trunc:
+                    env.reset()
+            barrier.wait()
+    except BaseException:
+        # destrava o processo principal, que recebe BrokenBarrierError
+        barrier.abort()
+        raise
+    finally:
+        # as views precisam morrer antes do close do bloco
+        del envs, rewards, terminated, truncated, actions, command, v
+        shm.close()
+
+
+class SharedVectorEnv:
+    def __init__(self, num_envs, workers=None, board=None, max_steps=MAX_FRAMES):
+        self.num_envs = num_envs
+        workers = max(1, min(workers or os.cpu_count() or 1, num_envs))
+        level = Simulation(board).level
+        self.obs_shape = (N_PLANES, level.rows, level.cols)
+        _, size = _layout(num_envs, self.obs_shape)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        v = _views(self._shm.buf, num_envs, self.obs_shape)
+        self.obs, self.rewards = v['obs'], v['rewards']
+        self.terminated, self.truncated = v['terminated'], v['truncated']
+        self.actions, self._command = v['actions'], v['command']
+        ctx = mp.get_context()
+        self._barrier = ctx.Barrier(workers + 1)
+        # ambientes divididos em fatias contíguas, uma por worker
+        bounds = [num_envs * k // workers for k in range(workers + 1)]
+        self._procs = [ctx.Process(target=_worker, daemon=True,
+                                   args=(self._shm.name, num_envs, self.obs_shape, bounds[k], bounds[k + 1],
+                                         board, max_steps, self._barrier))
+                       for k in range(workers)]
+        for p in self._procs:
+            p.start()
+        self.closed = False
+
+    def _run(self, command):
+        self._command[0] = command
+        self._barrier.wait()
+        self._barrier.wait()
+
+    def reset(self):
+        """Reinicia todos os ambientes; devolve o array de observações compartilhado."""
+        self._run(_RESET)
+        return self.obs
+
+    def step(self, actions):
+        """
+        actions: uma ação por ambiente (0:R, 1:L, 2:U, 3:D, 4 mantém). Devolve
+        (obs, rewards, terminated, truncated), todos views do bloco compartilhado:
+        são sobrescritos no próximo step.
+        """
+        self.actions[:] = actions
+        self._run(_STEP)
+        return self.obs, self.rewards, self.terminated, self.truncated
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._command[0] = _CLOSE
+            self._barrier.wait(timeout=5)
+        except Exception:
+            pass
+        for p in self._procs:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        self.obs = self.rewards = self.terminated = self.truncated = self.actions = self._command = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()